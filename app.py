@@ -1,44 +1,104 @@
 import os
 import sys
-from flask import Flask, request, jsonify, render_template, redirect, url_for
+from flask import Flask, request, jsonify, render_template, redirect, url_for, Response, stream_with_context, g
 from dotenv import load_dotenv
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
+import startup_profile
+
+# Load environment variables from .env file before the modules that read them
+with startup_profile.phase('env load'):
+    load_dotenv()
+
 import database as db
 import slack_utils
+import log_writer
+import deferred
+import rate_limit
+import bulk_io
+import metrics
+import log_archive
+import click
+import io
+import hashlib
+import time
+import math
 import traceback
 from urllib.parse import quote as url_quote
 import json
 import logging
 from datetime import datetime
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging; LOG_LEVEL=DEBUG for verbose output
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['DEBUG'] = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
 
-# Initialize database
-try:
-    db.init_db()
-except Exception as e:
-    logger.error(f"Failed to initialize database: {str(e)}")
-    logger.error(traceback.format_exc())
+# Completions returned by the autocomplete endpoints (Slack allows up to 100 options)
+AUTOCOMPLETE_LIMIT = int(os.getenv('AUTOCOMPLETE_LIMIT', '10'))
+
+# Results shown for "/whatis search <words>"
+SEARCH_RESULT_LIMIT = int(os.getenv('SEARCH_RESULT_LIMIT', '5'))
+
+# The database connects lazily and runs init_db once, on first use
+# The Slack client is created on first use by slack_utils.get_slack_client
 
-# Initialize Slack client
-SLACK_BOT_TOKEN = os.environ.get('SLACK_BOT_TOKEN')
-slack_client = WebClient(token=SLACK_BOT_TOKEN)
+logger.debug("Python version: %s", sys.version)
 
-# Print debug information
-logger.debug(f"Python version: {sys.version}")
-logger.debug(f"Current working directory: {os.getcwd()}")
-logger.debug(f"Directory contents: {os.listdir('.')}")
-logger.debug(f"Environment variables: REDIS_TLS_URL={'REDIS_TLS_URL' in os.environ}")
+# Set SLACK_VERIFY_REQUESTS=false to accept unsigned requests (local testing only)
+SLACK_VERIFY_REQUESTS = os.getenv('SLACK_VERIFY_REQUESTS', 'true').lower() == 'true'
+
+# Registered before the signature check so rejected requests are timed too
+@app.before_request
+def start_request_timer():
+    g.request_started_at = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Record latency per route pattern (not per URL, to keep label cardinality bounded)."""
+    started_at = g.get('request_started_at')
+    if started_at is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.http_request_seconds.observe(time.perf_counter() - started_at, route, request.method)
+        metrics.http_requests.inc(route, str(response.status_code))
+    return response
+
+def admin_team_id():
+    """
+    Workspace an admin request works on, from the team_id query or form
+    parameter. None means the default namespace; see database.get_namespace.
+    """
+    return request.values.get('team_id') or None
+
+def invalid_team_id_response():
+    return jsonify({'error': 'Invalid team_id'}), 400
+
+@app.before_request
+def validate_team_id():
+    """Reject admin requests for a malformed team_id before they reach Redis."""
+    # Slack handlers check their own team_id: reading the form here would
+    # consume the body before verify_slack_signature hashes it
+    if request.path.startswith('/slack/'):
+        return None
+    team_id = request.values.get('team_id')
+    if team_id and not db.is_valid_team_id(team_id):
+        return invalid_team_id_response()
+    return None
+
+@app.before_request
+def verify_slack_signature():
+    """Reject /slack/* requests that aren't signed by Slack."""
+    if not SLACK_VERIFY_REQUESTS or not request.path.startswith('/slack/'):
+        return None
+    # cache=True keeps the raw body available for request.form afterwards
+    if not slack_utils.verify_slack_request(
+        request.get_data(cache=True),
+        request.headers.get('X-Slack-Request-Timestamp', ''),
+        request.headers.get('X-Slack-Signature', '')
+    ):
+        return jsonify({'error': 'Invalid request signature'}), 401
+    return None
 
 @app.errorhandler(500)
 def handle_500(error):
@@ -67,11 +127,12 @@ def handle_500(error):
 def index():
     """Health check endpoint with Redis connection test."""
     try:
-        if db.redis_client is None:
+        client = db.get_redis_client()
+        if client is None:
             raise Exception("Redis client is not initialized")
             
         # Test Redis connection
-        db.redis_client.ping()
+        client.ping()
         return jsonify({
             "status": "healthy",
             "redis_connection": "connected",
@@ -92,13 +153,11 @@ def index():
 def admin_dashboard():
     """Admin dashboard with enhanced error handling."""
     try:
-        if db.redis_client is None:
+        if db.get_redis_client() is None:
             raise Exception("Redis client is not initialized")
             
-        logger.debug("Attempting to get all terms")
-        terms = db.get_all_terms()
-        logger.debug(f"Successfully retrieved {len(terms)} terms")
-        return render_template('admin.html', terms=terms)
+        # Terms are paged in by the page itself through /admin/terms
+        return render_template('admin.html')
     except Exception as e:
         logger.error("Error in admin_dashboard!")
         logger.error(f"Error type: {type(e).__name__}")
@@ -108,72 +167,212 @@ def admin_dashboard():
             "error": "Internal Server Error",
             "message": str(e),
             "traceback": traceback.format_exc(),
-            "redis_client_status": "not initialized" if db.redis_client is None else "initialized"
+            "redis_client_status": "not initialized" if db.get_redis_client() is None else "initialized"
         }), 500
 
 @app.route('/slack/command', methods=['POST'])
 def handle_command():
-    # Verify request is from Slack
+    # The signature was checked by verify_slack_signature
     if not request.form:
         return jsonify({'error': 'Invalid request'}), 400
     
     # Get command text
     text = request.form.get('text', '').strip()
     user_id = request.form.get('user_id', '')
+    response_url = request.form.get('response_url', '')
+    team_id = request.form.get('team_id', '')
+    received_at = time.monotonic()
+    
+    if team_id and not db.is_valid_team_id(team_id):
+        return invalid_team_id_response()
     
     if not text:
-        return jsonify({
-            'response_type': 'ephemeral',
-            'text': 'Please provide a term to look up. Usage: /whatis <term>'
-        })
+        return jsonify(usage_response())
     
-    # Look up the term
-    term_info = db.get_term(text)
+    allowed, retry_after = rate_limit.check(team_id, user_id)
+    if not allowed:
+        metrics.lookups.inc('rate_limited')
+        return jsonify(rate_limited_response(retry_after))
+    
+    # "/whatis search <words>" searches definitions instead of names
+    query = search_query(text)
+    if query is not None:
+        metrics.lookups.inc('search')
+        # Acknowledge now and post the results when they are ready
+        if deferred.defer(response_url, received_at, search_response, user_id, query, team_id):
+            return '', 200
+        return jsonify(search_response(user_id, query, team_id))
+    
+    # Common misses are answered with bytes rendered earlier
+    version, cached = db.get_cached_response(text, tenant=team_id)
+    if cached is not None:
+        found, body = cached
+        metrics.lookups.inc('found' if found else 'miss')
+        log_writer.log_query(user_id, text, found, team_id)
+        return json_body_response(body)
+    
+    # Look up the term in the workspace's glossary
+    term_info = db.get_term(text, tenant=team_id)
     
     if term_info:
+        metrics.lookups.inc('found')
         # Log successful query
-        db.log_query(user_id, text, True)
-        
-        response = {
-            'response_type': 'in_channel',
+        log_writer.log_query(user_id, text, True, team_id)
+        # Hits aren't cached: the term cache already makes them as cheap
+        return json_body_response(render_json(term_response(term_info)))
+    
+    metrics.lookups.inc('miss')
+    # Log failed query
+    log_writer.log_query(user_id, text, False, team_id)
+    
+    # Suggestions may need the fuzzy scan, so acknowledge now and post them later
+    if deferred.defer(response_url, received_at, cached_suggestion_response, text, team_id, version):
+        return '', 200
+    body = render_json(suggestion_response(text, team_id))
+    db.cache_response(text, version, False, body, tenant=team_id)
+    return json_body_response(body)
+
+# Slack response builders, shared with the asyncio entry point in asgi.py
+
+def render_json(payload):
+    """Serialize a Slack payload once, for the response and the response cache."""
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+def json_body_response(body):
+    return Response(body, mimetype='application/json')
+
+def usage_response():
+    return {
+        'response_type': 'ephemeral',
+        'text': 'Please provide a term to look up. Usage: /whatis <term> or /whatis search <words>'
+    }
+
+def rate_limited_response(retry_after):
+    return {
+        'response_type': 'ephemeral',
+        'text': f'You\'re looking things up a little too quickly. Please try again in {math.ceil(retry_after)} seconds.'
+    }
+
+def search_query(text):
+    """Return the words of a "search <words>" command, or None for a term lookup."""
+    if text.lower().startswith('search '):
+        return text[len('search '):].strip()
+    return None
+
+def term_response(term_info):
+    """Build the Slack response for a found term."""
+    return {
+        'response_type': 'in_channel',
+        'blocks': [
+            {
+                'type': 'section',
+                'text': {
+                    'type': 'mrkdwn',
+                    'text': f'*{term_info["term"]}*\n{term_info["definition"]}'
+                }
+            }
+        ]
+    }
+
+def suggestion_response(text, team_id=None):
+    """Build the Slack response for a term that wasn't found."""
+    # Prefix completions come from the name index in one round trip;
+    # only fall back to the fuzzy scan when there are none
+    suggested_names = db.autocomplete(text, limit=3, tenant=team_id)
+    if not suggested_names:
+        suggested_names = [term['term'] for term in db.find_similar_terms(text, limit=3, tenant=team_id)]
+    return suggestions_response(suggested_names)
+
+def cached_suggestion_response(text, team_id, version):
+    """
+    suggestion_response for a deferred reply, also caching it so the same
+    miss is answered inline, without the fuzzy scan, next time.
+    """
+    response = suggestion_response(text, team_id)
+    db.cache_response(text, version, False, render_json(response), tenant=team_id)
+    return response
+
+def suggestions_response(suggested_names):
+    """Build the "did you mean" response from suggested term names."""
+    if suggested_names:
+        suggestions = '\n'.join([f'• {name}' for name in suggested_names])
+        return {
+            'response_type': 'ephemeral',
             'blocks': [
                 {
                     'type': 'section',
                     'text': {
                         'type': 'mrkdwn',
-                        'text': f'*{term_info["term"]}*\n{term_info["definition"]}'
+                        'text': f'Term not found. Did you mean:\n{suggestions}'
                     }
                 }
             ]
         }
-    else:
-        # Log failed query
-        db.log_query(user_id, text, False)
-        
-        # Find similar terms
-        similar_terms = db.find_similar_terms(text)
-        
-        if similar_terms:
-            suggestions = '\n'.join([f'• {term["term"]}' for term in similar_terms[:3]])
-            response = {
-                'response_type': 'ephemeral',
-                'blocks': [
-                    {
-                        'type': 'section',
-                        'text': {
-                            'type': 'mrkdwn',
-                            'text': f'Term not found. Did you mean:\n{suggestions}'
-                        }
-                    }
-                ]
-            }
-        else:
-            response = {
-                'response_type': 'ephemeral',
-                'text': 'Term not found. Please check your spelling or add it to the glossary.'
+    return {
+        'response_type': 'ephemeral',
+        'text': 'Term not found. Please check your spelling or add it to the glossary.'
+    }
+
+def search_response(user_id, query, team_id=None):
+    """Build the Slack response for a full-text search of the glossary."""
+    results = db.search_terms(query, limit=SEARCH_RESULT_LIMIT, tenant=team_id)
+    log_writer.log_query(user_id, query, bool(results), team_id, kind=db.SEARCH_LOG_KIND)
+    if not results:
+        return {
+            'response_type': 'ephemeral',
+            'text': f'No definitions mention "{query}".'
+        }
+    lines = '\n'.join(
+        f'• *{term["term"]}*: {term["definition"][:200]}' for term in results
+    )
+    return {
+        'response_type': 'ephemeral',
+        'blocks': [
+            {
+                'type': 'section',
+                'text': {
+                    'type': 'mrkdwn',
+                    'text': f'Definitions matching "{query}":\n{lines}'
+                }
             }
-    
-    return jsonify(response)
+        ]
+    }
+
+@app.route('/slack/options', methods=['POST'])
+def slack_options():
+    """Options source for Slack external select menus: term names matching what the user typed."""
+    try:
+        payload = json.loads(request.form.get('payload', '{}'))
+    except ValueError:
+        return jsonify({'error': 'Invalid payload'}), 400
+    team_id = (payload.get('team') or {}).get('id')
+    if team_id and not db.is_valid_team_id(team_id):
+        return invalid_team_id_response()
+    names = db.autocomplete(payload.get('value', ''), limit=AUTOCOMPLETE_LIMIT, tenant=team_id)
+    return jsonify({
+        'options': [
+            {'text': {'type': 'plain_text', 'text': name[:75]}, 'value': name[:150]}
+            for name in names
+        ]
+    })
+
+@app.route('/admin/search', methods=['GET'])
+def admin_search():
+    """Full-text search over term names and definitions, ranked with BM25."""
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    return jsonify({'terms': db.search_terms(request.args.get('q', ''), limit=limit, tenant=admin_team_id())})
+
+@app.route('/admin/autocomplete', methods=['GET'])
+def admin_autocomplete():
+    """Term names starting with the q parameter, for the admin search box."""
+    try:
+        limit = min(max(int(request.args.get('limit', AUTOCOMPLETE_LIMIT)), 1), 100)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    return jsonify(db.autocomplete(request.args.get('q', '').strip(), limit=limit, tenant=admin_team_id()))
 
 @app.route('/admin/add', methods=['POST'])
 def add_term():
@@ -183,7 +382,7 @@ def add_term():
     if not term or not definition:
         return jsonify({'error': 'Both term and definition are required'}), 400
     
-    success = db.add_term(term, definition)
+    success = db.add_term(term, definition, tenant=admin_team_id())
     
     if success:
         return redirect(url_for('admin_dashboard'))
@@ -198,7 +397,7 @@ def update_term():
     if not term or not definition:
         return jsonify({'error': 'Both term and definition are required'}), 400
     
-    success = db.update_term(term, definition)
+    success = db.update_term(term, definition, tenant=admin_team_id())
     
     if success:
         return redirect(url_for('admin_dashboard'))
@@ -212,7 +411,7 @@ def delete_term():
     if not term:
         return jsonify({'error': 'Term is required'}), 400
     
-    success = db.delete_term(term)
+    success = db.delete_term(term, tenant=admin_team_id())
     
     if success:
         return redirect(url_for('admin_dashboard'))
@@ -222,61 +421,32 @@ def delete_term():
 @app.route('/admin/analytics', methods=['GET'])
 def get_analytics():
     """
-    Admin endpoint to get usage analytics using Redis.
+    Admin endpoint to get usage analytics from the cached snapshot of the
+    pre-aggregated Redis counters, with ETag support.
+
+    With ?start=YYYY-MM-DD and/or ?end=YYYY-MM-DD, analytics for that range
+    are computed from the raw logs, including archived days.
     """
     try:
-        if db.redis_client is None:
+        if db.get_redis_client() is None:
             raise Exception("Redis client is not initialized")
 
-        # Get all logs
-        logs = []
-        raw_logs = db.redis_client.lrange('logs', 0, -1)
-        for log in raw_logs:
-            logs.append(json.loads(log))
-
-        # Calculate analytics
-        term_counts = {}
-        daily_queries = {}
-        unique_users = set()
-        found_count = 0
-
-        for log in logs:
-            # Count terms
-            term = log.get('term', '')
-            term_counts[term] = term_counts.get(term, 0) + 1
-            
-            # Count daily queries
-            date = log.get('timestamp', '').split('T')[0]
-            daily_queries[date] = daily_queries.get(date, 0) + 1
-            
-            # Track unique users
-            unique_users.add(log.get('user_id', ''))
-            
-            # Track successful queries
-            if log.get('found', False):
-                found_count += 1
-
-        # Format the results
-        top_terms = [
-            {'term': term, 'count': count}
-            for term, count in sorted(term_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        ]
-
-        daily_queries_list = [
-            {'date': date, 'count': count}
-            for date, count in sorted(daily_queries.items(), reverse=True)[:7]
-        ]
-
-        total_queries = len(logs)
-        success_rate = (found_count / total_queries * 100) if total_queries > 0 else 0
-
-        return jsonify({
-            "top_terms": top_terms,
-            "daily_queries": daily_queries_list,
-            "total_queries": total_queries,
-            "unique_users": len(unique_users),
-            "success_rate": success_rate
-        })
+        if 'start' in request.args or 'end' in request.args:
+            try:
+                start, end = log_archive.parse_range(request.args.get('start'), request.args.get('end'))
+                return jsonify(log_archive.get_range_analytics(start, end, tenant=admin_team_id()))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        snapshot = db.get_analytics_snapshot(tenant=admin_team_id())
+        etag = f"analytics-{snapshot['version']}-{snapshot['computed_at']:.3f}"
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers={'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'})
+        response = jsonify(dict(snapshot['analytics'], snapshot_version=snapshot['version'],
+                                snapshot_computed_at=datetime.utcfromtimestamp(snapshot['computed_at']).isoformat()))
+        response.set_etag(etag)
+        # Browsers revalidate on every page view and get a 304 while the snapshot is unchanged
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
     except Exception as e:
         logger.error("Error in analytics!")
         logger.error(f"Error type: {type(e).__name__}")
@@ -288,6 +458,239 @@ def get_analytics():
             "traceback": traceback.format_exc()
         }), 500
 
+@app.route('/admin/terms', methods=['GET'])
+def list_terms():
+    """
+    Page through terms as JSON.
+
+    Query parameters: limit (default 50, max 500), cursor (from the previous
+    page's next_cursor), q (search text) and match (prefix or substring).
+    Responses carry an ETag derived from terms:version, so unchanged pages
+    are answered with 304.
+    """
+    match = request.args.get('match', 'prefix')
+    if match not in ('prefix', 'substring'):
+        return jsonify({'error': 'match must be prefix or substring'}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    cursor = request.args.get('cursor') or None
+    query = request.args.get('q', '').strip()
+
+    try:
+        etag = hashlib.sha1(
+            f"{db.get_terms_version(tenant=admin_team_id())}|{request.query_string.decode()}".encode()
+        ).hexdigest()
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers={'ETag': f'"{etag}"'})
+
+        terms, next_cursor = db.list_terms(cursor=cursor, limit=limit, query=query, match=match,
+                                           tenant=admin_team_id())
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    except Exception as e:
+        logger.error(f"Error listing terms: {str(e)}")
+        return jsonify({'error': 'Internal Server Error', 'message': str(e)}), 500
+
+    response = jsonify({'terms': terms, 'next_cursor': next_cursor})
+    response.set_etag(etag)
+    return response
+
+def parse_aliases(data):
+    """Return the optional aliases list from a JSON body; raises ValueError if malformed."""
+    aliases = data.get('aliases')
+    if aliases is None:
+        return None
+    if not isinstance(aliases, list) or not all(isinstance(alias, str) for alias in aliases):
+        raise ValueError('aliases must be a list of strings')
+    return [alias.strip() for alias in aliases if alias.strip()]
+
+def alias_conflict_response(error):
+    return jsonify({'error': str(error), 'conflicts': error.aliases}), 409
+
+@app.route('/admin/terms', methods=['POST', 'PUT'])
+def save_term_json():
+    """
+    Add (POST) or update (PUT) a term from a JSON body. An optional
+    `aliases` list replaces the term's aliases; on PUT, leaving it out
+    keeps them.
+    """
+    data = request.get_json(silent=True) or {}
+    term = (data.get('term') or '').strip()
+    definition = (data.get('definition') or '').strip()
+    if not term or not definition:
+        return jsonify({'error': 'Both term and definition are required'}), 400
+    try:
+        aliases = parse_aliases(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        if request.method == 'POST':
+            if not db.add_term(term, definition, tenant=admin_team_id(), aliases=aliases):
+                return jsonify({'error': 'Term already exists'}), 400
+            return jsonify({'term': term, 'definition': definition, 'aliases': aliases or []}), 201
+
+        if not db.update_term(term, definition, tenant=admin_team_id(), aliases=aliases):
+            return jsonify({'error': 'Term not found'}), 404
+    except db.AliasConflictError as e:
+        return alias_conflict_response(e)
+    response = {'term': term, 'definition': definition}
+    if aliases is not None:
+        response['aliases'] = aliases
+    return jsonify(response)
+
+@app.route('/admin/aliases', methods=['PUT'])
+def set_aliases():
+    """Replace a term's aliases from a JSON body {"term": ..., "aliases": [...]}."""
+    data = request.get_json(silent=True) or {}
+    term = (data.get('term') or '').strip()
+    if not term:
+        return jsonify({'error': 'Term is required'}), 400
+    try:
+        aliases = parse_aliases(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if aliases is None:
+        return jsonify({'error': 'aliases is required'}), 400
+
+    try:
+        stored = db.set_aliases(term, aliases, tenant=admin_team_id())
+    except db.AliasConflictError as e:
+        return alias_conflict_response(e)
+    except Exception as e:
+        logger.error(f"Error setting aliases: {str(e)}")
+        return jsonify({'error': 'Internal Server Error', 'message': str(e)}), 500
+    if stored is None:
+        return jsonify({'error': 'Term not found'}), 404
+    return jsonify({'term': term, 'aliases': stored})
+
+@app.route('/admin/terms', methods=['DELETE'])
+def delete_term_json():
+    """Delete a term named in a JSON body."""
+    data = request.get_json(silent=True) or {}
+    term = (data.get('term') or '').strip()
+    if not term:
+        return jsonify({'error': 'Term is required'}), 400
+    if not db.delete_term(term, tenant=admin_team_id()):
+        return jsonify({'error': 'Term not found'}), 404
+    return jsonify({'deleted': term})
+
+@app.route('/admin/import', methods=['POST'])
+def import_terms():
+    """
+    Bulk-import terms from an NDJSON or CSV request body.
+
+    Query parameters: format (ndjson or csv), mode (skip or upsert) and
+    batch_size. The body is parsed and written incrementally.
+    """
+    fmt = request.args.get('format', 'ndjson')
+    mode = request.args.get('mode', 'skip')
+    if fmt not in bulk_io.FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(bulk_io.FORMATS)}"}), 400
+    if mode not in ('skip', 'upsert'):
+        return jsonify({'error': 'mode must be skip or upsert'}), 400
+    try:
+        batch_size = int(request.args.get('batch_size', db.IMPORT_BATCH_SIZE))
+    except ValueError:
+        return jsonify({'error': 'batch_size must be an integer'}), 400
+    if batch_size < 1:
+        return jsonify({'error': 'batch_size must be positive'}), 400
+
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8', errors='replace', newline='')
+    try:
+        report = db.import_terms(bulk_io.parse(stream, fmt), mode=mode, batch_size=batch_size,
+                                 tenant=admin_team_id())
+    except Exception as e:
+        logger.error(f"Error importing terms: {str(e)}")
+        return jsonify({'error': 'Import failed', 'message': str(e)}), 500
+    return jsonify(report)
+
+@app.route('/admin/export', methods=['GET'])
+def export_terms():
+    """Stream every term as NDJSON or CSV straight from the batched name index."""
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in bulk_io.FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(bulk_io.FORMATS)}"}), 400
+    return Response(
+        stream_with_context(bulk_io.export(db.iter_terms(tenant=admin_team_id()), fmt)),
+        mimetype=bulk_io.CONTENT_TYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename=glossary.{fmt}'}
+    )
+
+# Maintenance commands run for every workspace unless --team-id picks one
+team_id_option = click.option('--team-id', default=None,
+                              help='Only this workspace (default: every namespace).')
+
+def cli_tenants(team_id):
+    return [team_id] if team_id else db.list_tenants()
+
+def tenant_label(team_id):
+    return team_id or 'default namespace'
+
+@app.cli.command('rebuild-index')
+@team_id_option
+def rebuild_index_command(team_id):
+    """Rebuild the sorted-set name index used by /admin/terms."""
+    for tenant in cli_tenants(team_id):
+        indexed = db.rebuild_term_index(tenant=tenant)
+        print(f"{tenant_label(tenant)}: indexed {indexed} terms")
+
+@app.cli.command('rebuild-search-index')
+@team_id_option
+def rebuild_search_index_command(team_id):
+    """Rebuild the full-text search index over definitions."""
+    for tenant in cli_tenants(team_id):
+        indexed = db.rebuild_search_index(tenant=tenant)
+        print(f"{tenant_label(tenant)}: indexed {indexed} terms for search")
+
+@app.cli.command('rebuild-alias-index')
+@team_id_option
+def rebuild_alias_index_command(team_id):
+    """Rebuild the alias index from term names and their aliases."""
+    for tenant in cli_tenants(team_id):
+        entries = db.rebuild_alias_index(tenant=tenant)
+        print(f"{tenant_label(tenant)}: indexed {entries} names and aliases")
+
+@app.cli.command('backfill-analytics')
+@team_id_option
+def backfill_analytics_command(team_id):
+    """Rebuild the pre-aggregated analytics counters from the query logs in Redis."""
+    for tenant in cli_tenants(team_id):
+        replayed = db.backfill_analytics(tenant=tenant)
+        print(f"{tenant_label(tenant)}: backfilled analytics from {replayed} log entries")
+
+@app.cli.command('archive-logs')
+@click.option('--older-than', type=int, default=None,
+              help='Archive days older than this many days (default LOG_ARCHIVE_AFTER_DAYS).')
+@team_id_option
+def archive_logs_command(older_than, team_id):
+    """Move old query logs from Redis to gzipped NDJSON files."""
+    for tenant in cli_tenants(team_id):
+        report = log_archive.archive_logs(older_than, tenant=tenant)
+        print(f"{tenant_label(tenant)}: archived {report['entries']} log entries from {report['days']} days "
+              f"to {log_archive.LOG_ARCHIVE_DIR}")
+
+@app.cli.command('migrate-terms')
+@team_id_option
+def migrate_terms_command(team_id):
+    """Convert terms stored as JSON strings to Redis hashes."""
+    for tenant in cli_tenants(team_id):
+        report = db.migrate_terms_to_hashes(tenant=tenant)
+        print(f"{tenant_label(tenant)}: scanned {report['scanned']} terms, migrated {report['migrated']}")
+        if report['migrated'] and report['bytes_before'] is not None:
+            print(f"Memory usage of migrated keys: {report['bytes_before']} bytes as JSON, "
+                  f"{report['bytes_after']} bytes as hashes")
+
+@app.cli.command('snapshot-terms')
+@team_id_option
+def snapshot_terms_command(team_id):
+    """Write the local glossary snapshot, e.g. to ship it with a deploy."""
+    for tenant in cli_tenants(team_id):
+        store = db.refresh_snapshot(tenant=tenant)
+        print(f"{tenant_label(tenant)}: {store.terms_count} terms at version {store.version} in {store.path}")
+
 @app.route('/seed', methods=['GET'])
 def seed_database():
     """
@@ -320,12 +723,56 @@ def seed_database():
         ("IMO", "In My Opinion - Used to express a personal view or judgment on a matter.")
     ]
     
-    # Add each term to the database
-    for term, definition in example_terms:
-        db.add_term(term, definition)
+    # Add the terms in one pipelined batch, leaving existing ones alone
+    db.import_terms(
+        ({'line': line, 'term': term, 'definition': definition}
+         for line, (term, definition) in enumerate(example_terms, start=1)),
+        tenant=admin_team_id()
+    )
     
     return jsonify({"message": "Database seeded with example terms"})
 
+def collect_runtime_metrics():
+    """Expose the counters other modules already keep, read at scrape time."""
+    term_cache = db.get_term_cache_stats()
+    response_cache = db.get_response_cache_stats()
+    connection = db.get_connection_stats()
+    writer = log_writer.get_stats()
+    responder = deferred.get_stats()
+    limiter = rate_limit.limiter.get_stats()
+    return [
+        ('whatis_term_cache_lookups_total', 'counter', 'get_term cache lookups by result.',
+         [({'result': 'hit'}, term_cache['hits']), ({'result': 'miss'}, term_cache['misses'])]),
+        ('whatis_term_cache_hit_ratio', 'gauge', 'get_term cache hit ratio since start.', term_cache['hit_ratio']),
+        ('whatis_term_cache_size', 'gauge', 'Entries in the get_term cache.', term_cache['size']),
+        ('whatis_term_cache_evictions_total', 'counter', 'get_term cache evictions.', term_cache['evictions']),
+        ('whatis_response_cache_lookups_total', 'counter', 'Pre-rendered response cache lookups by result.',
+         [({'result': 'hit'}, response_cache['hits']), ({'result': 'miss'}, response_cache['misses'])]),
+        ('whatis_response_cache_size', 'gauge', 'Entries in the pre-rendered response cache.',
+         response_cache['size']),
+        ('whatis_namespaces_cached', 'gauge', 'Workspace namespaces with caches in this worker.',
+         term_cache['namespaces']),
+        ('whatis_redis_connected', 'gauge', 'Whether this worker has a Redis client.', int(connection['connected'])),
+        ('whatis_redis_connect_failures', 'gauge', 'Consecutive failed Redis connection attempts.',
+         connection['failures']),
+        ('whatis_query_log_entries_total', 'counter', 'Query log entries by outcome.',
+         [({'outcome': name}, writer.get(name, 0)) for name in ('queued', 'written', 'dropped', 'failed')]),
+        ('whatis_query_log_queue_depth', 'gauge', 'Query log entries waiting to be written.', writer['queue_depth']),
+        ('whatis_deferred_queue_depth', 'gauge', 'Deferred Slack responses queued or running.',
+         responder['queue_depth']),
+        ('whatis_deferred_responses_total', 'counter', 'Deferred Slack responses by outcome.',
+         [({'outcome': name}, responder.get(name, 0)) for name in ('submitted', 'completed', 'failed', 'rejected')]),
+        ('whatis_rate_limit_decisions_total', 'counter', 'Rate limit decisions by outcome.',
+         [({'outcome': name}, limiter[name]) for name in ('allowed', 'rejected', 'rejected_local', 'errors')]),
+    ]
+
+metrics.register_collector(collect_runtime_metrics)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus scrape endpoint for this worker process."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/debug')
 def debug():
     """Debug endpoint to check configuration."""
@@ -337,6 +784,12 @@ def debug():
             "redis_url_exists": 'REDIS_TLS_URL' in os.environ,
             "redis_connection": None,
             "redis_ping": None,
+            "term_cache": db.get_term_cache_stats(),
+            "response_cache": db.get_response_cache_stats(),
+            "snapshot": db.get_snapshot_stats(),
+            "redis_pool": db.get_connection_stats(),
+            "deferred_responses": deferred.get_stats(),
+            "rate_limit": rate_limit.limiter.get_stats(),
             "environment_variables": {
                 key: '[HIDDEN]' if 'SECRET' in key or 'URL' in key else value
                 for key, value in os.environ.items()
@@ -345,7 +798,7 @@ def debug():
         
         try:
             # Test Redis connection
-            db.redis_client.ping()
+            db.get_redis_client().ping()
             debug_info["redis_connection"] = "Success"
             debug_info["redis_ping"] = "Success"
         except Exception as e:
@@ -0,0 +1,186 @@
+"""
+ASGI entry point, an alternative to wsgi.py for high-concurrency serving:
+
+    uvicorn asgi:application --workers 2
+
+/slack/command, the endpoint that sees bursts (everyone typing /whatis
+during an all-hands), is served on the event loop: lookups and rate
+limits go through redis.asyncio, and fuzzy scoring runs on a thread pool,
+so one process holds hundreds of commands in flight without a thread
+each. Every other route (/admin/*, /, /metrics, /slack/options ...) is the
+Flask app, run on a bounded thread pool by a2wsgi. Both paths share
+database.py's storage layer and app.py's Slack responses.
+"""
+
+import logging
+import os
+import time
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+
+import startup_profile
+
+with startup_profile.phase('import app'):
+    import app as flask_app
+
+import database as db
+import database_async as adb
+import deferred
+import log_writer
+import metrics
+import rate_limit
+import slack_utils
+
+logger = logging.getLogger(__name__)
+
+# Threads serving the Flask routes
+WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', '10'))
+
+SLACK_COMMAND_ROUTE = '/slack/command'
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] != 'http.request':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+async def send_body(send, body, status=200):
+    """Send a JSON body, or an empty acknowledgement when body is None."""
+    content_type = b'application/json' if body is not None else b'text/plain; charset=utf-8'
+    body = body or b''
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', content_type), (b'content-length', str(len(body)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def log_query(user_id, term, found, team_id):
+    """Queue a query log entry, in a thread if logging could block."""
+    if log_writer.ASYNC_QUERY_LOG and log_writer.LOG_QUEUE_OVERFLOW == 'drop':
+        log_writer.log_query(user_id, term, found, team_id)
+    else:
+        await adb.run_sync(log_writer.log_query, user_id, term, found, team_id)
+
+
+async def suggestion_response(text, team_id):
+    """Async app.suggestion_response: prefix completions, then the fuzzy scan off the loop."""
+    suggested_names = await adb.autocomplete(text, limit=3, tenant=team_id)
+    if not suggested_names:
+        similar = await adb.find_similar_terms(text, limit=3, tenant=team_id)
+        suggested_names = [term['term'] for term in similar]
+    return flask_app.suggestions_response(suggested_names)
+
+
+async def handle_command(headers, body):
+    """The /slack/command handler from app.py on the event loop; returns (body, status)."""
+    if flask_app.SLACK_VERIFY_REQUESTS and not slack_utils.verify_slack_request(
+        body,
+        headers.get(b'x-slack-request-timestamp', b'').decode(),
+        headers.get(b'x-slack-signature', b'').decode()
+    ):
+        return flask_app.render_json({'error': 'Invalid request signature'}), 401
+    form = {key: values[0] for key, values in parse_qs(body.decode('utf-8', 'replace')).items()}
+    if not form:
+        return flask_app.render_json({'error': 'Invalid request'}), 400
+
+    text = form.get('text', '').strip()
+    user_id = form.get('user_id', '')
+    response_url = form.get('response_url', '')
+    team_id = form.get('team_id', '')
+    received_at = time.monotonic()
+
+    if team_id and not db.is_valid_team_id(team_id):
+        return flask_app.render_json({'error': 'Invalid team_id'}), 400
+
+    if not text:
+        return flask_app.render_json(flask_app.usage_response()), 200
+
+    allowed, retry_after = await rate_limit.check_async(team_id, user_id)
+    if not allowed:
+        metrics.lookups.inc('rate_limited')
+        return flask_app.render_json(flask_app.rate_limited_response(retry_after)), 200
+
+    query = flask_app.search_query(text)
+    if query is not None:
+        metrics.lookups.inc('search')
+        if deferred.defer(response_url, received_at, flask_app.search_response, user_id, query, team_id):
+            return None, 200
+        return flask_app.render_json(await adb.run_sync(flask_app.search_response, user_id, query, team_id)), 200
+
+    version, cached = await adb.get_cached_response(text, tenant=team_id)
+    if cached is not None:
+        found, body = cached
+        metrics.lookups.inc('found' if found else 'miss')
+        await log_query(user_id, text, found, team_id)
+        return body, 200
+
+    term_info = await adb.get_term(text, tenant=team_id)
+    if term_info:
+        metrics.lookups.inc('found')
+        await log_query(user_id, text, True, team_id)
+        return flask_app.render_json(flask_app.term_response(term_info)), 200
+
+    metrics.lookups.inc('miss')
+    await log_query(user_id, text, False, team_id)
+    # Deferred suggestions run on the same worker pool as under WSGI
+    if deferred.defer(response_url, received_at, flask_app.cached_suggestion_response, text, team_id, version):
+        return None, 200
+    body = flask_app.render_json(await suggestion_response(text, team_id))
+    db.cache_response(text, version, False, body, tenant=team_id)
+    return body, 200
+
+
+async def slack_command(scope, receive, send):
+    started_at = time.perf_counter()
+    status = 500
+    try:
+        body, status = await handle_command(dict(scope['headers']), await read_body(receive))
+        await send_body(send, body, status)
+    except Exception as e:
+        logger.error(f"Error handling slash command: {type(e).__name__}: {str(e)}", exc_info=True)
+        await send_body(send, flask_app.render_json({'error': 'Internal Server Error'}), status)
+    finally:
+        metrics.http_request_seconds.observe(time.perf_counter() - started_at, SLACK_COMMAND_ROUTE, 'POST')
+        metrics.http_requests.inc(SLACK_COMMAND_ROUTE, str(status))
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Connect the sync client and run init_db before taking traffic.
+            # init_db only warns about missing indexes; rebuilding them is
+            # left to the flask maintenance commands
+            await adb.run_sync(db.get_redis_client)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await adb.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+class Application:
+    """Routes /slack/command to the async handler and everything else to Flask."""
+
+    def __init__(self, wsgi_app, wsgi_threads=WSGI_THREADS):
+        self.wsgi = WSGIMiddleware(wsgi_app, workers=wsgi_threads)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await lifespan(receive, send)
+        if scope['type'] == 'http' and scope['path'] == SLACK_COMMAND_ROUTE and scope['method'] == 'POST':
+            return await slack_command(scope, receive, send)
+        return await self.wsgi(scope, receive, send)
+
+
+application = Application(flask_app.app)
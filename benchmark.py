@@ -0,0 +1,752 @@
+#!/usr/bin/env python
+"""
+Benchmarks for the WhatIs storage layer.
+
+Runs against the Redis named by REDIS_URL, or an in-memory fakeredis
+server with --fake. Every benchmark seeds its own synthetic glossary
+under the normal key layout, so point it at a scratch database.
+
+    python benchmark.py --fake bulk-read --terms 10000
+    python benchmark.py --fake load --sizes 1000,10000 --save-baseline baseline.json
+    python benchmark.py --fake load --sizes 1000,10000 --baseline baseline.json
+    python benchmark.py --fake load --sizes 1000,10000 --asgi
+    python benchmark.py --fake response-cache --terms 10000
+    python benchmark.py --fake snapshot --terms 10000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+import redis
+
+import database as db
+
+
+class RoundTripCounter:
+    """Count Redis round trips by wrapping the connection's packed-command send."""
+
+    def __init__(self, client):
+        self.connection_class = client.connection_pool.connection_class
+        self.count = 0
+        self._original = None
+        self._local = threading.local()
+
+    def install(self):
+        original = self.connection_class.send_packed_command
+        counter = self
+
+        def send_packed_command(connection, *args, **kwargs):
+            counter.count += 1
+            counter._local.count = counter.thread_count() + 1
+            return original(connection, *args, **kwargs)
+
+        self._original = original
+        self.connection_class.send_packed_command = send_packed_command
+
+    def uninstall(self):
+        if self._original is not None:
+            self.connection_class.send_packed_command = self._original
+            self._original = None
+
+    def thread_count(self):
+        """Round trips made so far by the calling thread."""
+        return getattr(self._local, 'count', 0)
+
+    @contextmanager
+    def measure(self):
+        """Yield a dict that receives the round trips made inside the block."""
+        result = {}
+        start = self.count
+        yield result
+        result['round_trips'] = self.count - start
+
+
+def make_client(fake):
+    """Create the client the benchmarks run against."""
+    if fake:
+        import fakeredis
+        # An explicit server, so the asyncio client of --asgi can share it
+        return fakeredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    return redis.from_url(db.get_redis_url(), decode_responses=True)
+
+
+def synthetic_term(i):
+    term = f'TERM{i:06d}'
+    return {
+        'term': term,
+        'definition': f'Synthetic definition number {i}.',
+        'created_at': datetime.utcnow().isoformat()
+    }
+
+
+def seed_terms(client, count):
+    """Replace the glossary with `count` synthetic terms and their name index."""
+    client.flushdb()
+    pipe = client.pipeline(transaction=False)
+    for i in range(count):
+        term = f'TERM{i:06d}'
+        pipe.hset(f'term:{term.lower()}', mapping=synthetic_term(i))
+        pipe.zadd(db.TERMS_INDEX_KEY, {f'{term.lower()}\0{term}': 0})
+        if i % 1000 == 999:
+            pipe.execute()
+    pipe.execute()
+    client.set('terms:count', count)
+    # A fresh version makes worker-local caches drop the previous glossary
+    client.set(db.TERMS_VERSION_KEY, time.time_ns())
+    db._invalidate_local_caches(db.get_namespace())
+
+
+def seed_logs(client, count, term_count, batch_size=10000):
+    """
+    Append `count` synthetic query log entries spread over the last 30 days,
+    and write the analytics counters they add up to.
+    """
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    terms = Counter()
+    daily = Counter()
+    users = set()
+    found_count = 0
+    batches = {}
+    for i in range(count):
+        found = rng.random() < 0.8
+        term = f'TERM{rng.randrange(term_count):06d}' if found else f'MISSING{rng.randrange(1000)}'
+        timestamp = now - timedelta(days=rng.randrange(30), seconds=rng.randrange(86400))
+        user_id = f'U{rng.randrange(5000):04d}'
+        day = timestamp.date().isoformat()
+        batch = batches.setdefault(day, [])
+        batch.append(json.dumps({'user_id': user_id, 'term': term, 'found': found,
+                                 'timestamp': timestamp.isoformat()}))
+        terms[term] += 1
+        daily[day] += 1
+        users.add(user_id)
+        found_count += found
+        if len(batch) >= batch_size:
+            client.rpush(db.log_key(day), *batch)
+            batch.clear()
+    for day, batch in batches.items():
+        if batch:
+            client.rpush(db.log_key(day), *batch)
+
+    pipe = client.pipeline(transaction=False)
+    if batches:
+        pipe.sadd(db.LOG_DAYS_KEY, *batches)
+    if terms:
+        pipe.zadd(db.ANALYTICS_TERMS_KEY, dict(terms))
+        pipe.hset(db.ANALYTICS_DAILY_KEY, mapping=dict(daily))
+        pipe.pfadd(db.ANALYTICS_USERS_KEY, *users)
+    pipe.set(db.ANALYTICS_TOTAL_KEY, count)
+    pipe.set(db.ANALYTICS_FOUND_KEY, found_count)
+    pipe.execute()
+
+
+def legacy_get_all_terms(client):
+    """The original one-read-per-key path, kept for comparison."""
+    terms = []
+    for key in client.scan_iter("term:*"):
+        term_data = client.hgetall(key)
+        if term_data:
+            terms.append(term_data)
+    return sorted(terms, key=lambda x: x['term'].lower())
+
+
+def bench_bulk_read(client, counter, args):
+    """Compare round trips and wall time of the legacy and batched bulk reads."""
+    seed_terms(client, args.terms)
+    rows = []
+    for name, func in (
+        ('legacy get per key', lambda: legacy_get_all_terms(client)),
+        ('batched get_all_terms', db.get_all_terms),
+    ):
+        with counter.measure() as result:
+            start = time.perf_counter()
+            terms = func()
+            elapsed = time.perf_counter() - start
+        rows.append((name, len(terms), result['round_trips'], elapsed * 1000))
+
+    print(f"{'path':<24} {'terms':>8} {'round trips':>12} {'ms':>10}")
+    for name, count, round_trips, ms in rows:
+        print(f"{name:<24} {count:>8} {round_trips:>12} {ms:>10.1f}")
+
+
+def bench_storage_format(client, counter, args):
+    """Compare memory use and single-field update cost of JSON strings and hashes."""
+    client.flushdb()
+    count = args.terms
+    pipe = client.pipeline(transaction=False)
+    for i in range(count):
+        pipe.set(f'term:json{i:06d}', json.dumps(synthetic_term(i)))
+        pipe.hset(f'term:hash{i:06d}', mapping=synthetic_term(i))
+    pipe.execute()
+
+    def total_memory(prefix):
+        pipe = client.pipeline(transaction=False)
+        for i in range(count):
+            pipe.memory_usage(f'term:{prefix}{i:06d}')
+        try:
+            return sum(pipe.execute())
+        except (redis.exceptions.ResponseError, TypeError):
+            return None
+
+    def update_json(key):
+        # The old update_term: EXISTS, GET, decode, encode, SET
+        if client.exists(key):
+            term_data = json.loads(client.get(key))
+            term_data['definition'] = 'Updated.'
+            client.set(key, json.dumps(term_data))
+
+    def update_hash(key):
+        name = key.split(':', 1)[1]
+        ns = db.get_namespace()
+        db._run_script('update_term', keys=db._term_write_keys(name, ns),
+                       args=['Updated.', datetime.utcnow().isoformat(), name,
+                             db._search_payload(ns, name, 'Updated.')],
+                       client=client)
+
+    print(f"{'format':<8} {'bytes/term':>10} {'update round trips':>19} {'update us':>10}")
+    for name, prefix, update in (('json', 'json', update_json), ('hash', 'hash', update_hash)):
+        memory = total_memory(prefix)
+        updates = min(count, 1000)
+        with counter.measure() as result:
+            start = time.perf_counter()
+            for i in range(updates):
+                update(f'term:{prefix}{i:06d}')
+            elapsed = time.perf_counter() - start
+        per_term = f"{memory / count:.0f}" if memory is not None else 'n/a'
+        print(f"{name:<8} {per_term:>10} {result['round_trips'] / updates:>19.1f} "
+              f"{elapsed / updates * 1e6:>10.0f}")
+
+
+def bench_stress(client, counter, args):
+    """
+    Hammer /admin/add and /admin/delete from many threads over a small set
+    of terms and check that terms:count still matches the stored terms.
+    """
+    from app import app
+
+    client.flushdb()
+    client.set('terms:count', 0)
+    names = [f'STRESS{i:03d}' for i in range(args.stress_terms)]
+    statuses = {}
+    lock = threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        test_client = app.test_client()
+        for _ in range(args.requests):
+            name = rng.choice(names)
+            if rng.random() < 0.5:
+                response = test_client.post('/admin/add', data={'term': name, 'definition': 'Stress test.'})
+                action = 'add'
+            else:
+                response = test_client.post('/admin/delete', data={'term': name})
+                action = 'delete'
+            with lock:
+                key = (action, response.status_code)
+                statuses[key] = statuses.get(key, 0) + 1
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(args.threads)]
+    start = time.perf_counter()
+    with counter.measure() as result:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - start
+
+    stored = sum(1 for _ in client.scan_iter('term:*'))
+    counted = int(client.get('terms:count') or 0)
+    total = args.threads * args.requests
+    for (action, status), count in sorted(statuses.items()):
+        print(f"{action:<7} {status}: {count}")
+    print(f"{total} requests in {elapsed:.2f}s, {result['round_trips'] / total:.2f} round trips/request")
+    print(f"terms:count = {counted}, stored terms = {stored}")
+    if counted != stored:
+        raise SystemExit("Counter invariant violated")
+    print("Counter invariant holds")
+
+
+def bench_verify(client, counter, args):
+    """Measure the per-request cost of Slack signature verification."""
+    import hashlib
+    import hmac
+    import os
+    import slack_utils
+
+    secret = os.environ.setdefault('SLACK_SIGNING_SECRET', 'benchmark-secret')
+    body = ('token=x&team_id=T0001&user_id=U0001&command=%2Fwhatis&text=EOD'
+            '&response_url=https%3A%2F%2Fhooks.slack.com%2Fcommands%2F1').encode()
+    iterations = args.requests * 100
+    timestamp = str(int(time.time()))
+    signatures = [
+        'v0=' + hmac.new(secret.encode(), f'v0:{timestamp}:'.encode() + body + str(i).encode(),
+                         hashlib.sha256).hexdigest()
+        for i in range(iterations)
+    ]
+
+    cases = (
+        ('valid', lambda i: slack_utils.verify_slack_request(body + str(i).encode(), timestamp, signatures[i])),
+        ('bad signature', lambda i: slack_utils.verify_slack_request(body, timestamp, 'v0=' + '0' * 64)),
+        ('stale timestamp', lambda i: slack_utils.verify_slack_request(body, '1', signatures[i])),
+    )
+    print(f"{'case':<16} {'us/request':>10}")
+    for name, verify in cases:
+        slack_utils._replay_cache.clear()
+        start = time.perf_counter()
+        for i in range(iterations):
+            verify(i)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<16} {elapsed / iterations * 1e6:>10.2f}")
+
+
+def bench_response_cache(client, counter, args):
+    """
+    Per-request CPU time of /slack/command for hot terms and repeated
+    misses, with the pre-rendered response cache off and on. Only misses
+    are cached, so the hot terms show the noise floor. CPU is the
+    requesting thread's (time.thread_time), so the background query log
+    writer isn't counted.
+    """
+    os.environ.setdefault('SLACK_VERIFY_REQUESTS', 'false')
+    os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+    from app import app
+
+    seed_terms(client, args.terms)
+    test_client = app.test_client()
+    ns = db.get_namespace()
+    # Ten hot terms, and ten typos that miss and need the fuzzy scan for suggestions
+    texts = {
+        'hit': [f'TERM{i:06d}' for i in range(0, args.terms, max(1, args.terms // 10))][:10],
+        'miss': [f'TERM{i:05d}X' for i in range(0, args.terms, max(1, args.terms // 10))][:10],
+    }
+
+    def send(text):
+        return test_client.post('/slack/command', data={'user_id': 'U0001', 'team_id': 'T0001', 'text': text})
+
+    # Off and on alternate over several rounds and the fastest round is kept,
+    # so drift and noise don't land on one side
+    best = {}
+    for _ in range(5):
+        for cache, maxsize in (('off', 0), ('on', db.RESPONSE_CACHE_SIZE or 2048)):
+            ns.response_cache.maxsize = maxsize
+            ns.response_cache.clear()
+            for kind, names in texts.items():
+                for text in names:
+                    send(text)
+                trips_before = counter.thread_count()
+                cpu_start = time.thread_time()
+                start = time.perf_counter()
+                for i in range(args.requests):
+                    send(names[i % len(names)])
+                sample = ((time.thread_time() - cpu_start) / args.requests,
+                          (time.perf_counter() - start) / args.requests,
+                          (counter.thread_count() - trips_before) / args.requests)
+                if (kind, cache) not in best or sample < best[kind, cache]:
+                    best[kind, cache] = sample
+
+    print(f"{'kind':<6} {'cache':<6} {'cpu us/request':>15} {'wall us/request':>16} {'round trips':>12}")
+    for (kind, cache), (cpu, wall, trips) in sorted(best.items()):
+        print(f"{kind:<6} {cache:<6} {cpu * 1e6:>15.1f} {wall * 1e6:>16.1f} {trips:>12.2f}")
+    for kind in texts:
+        off, on = best[kind, 'off'][0], best[kind, 'on'][0]
+        print(f"{kind}: CPU per request {on / off - 1:+.0%} with the cache")
+
+
+def bench_snapshot(client, counter, args):
+    """
+    Round trips and latency of the glossary reads with and without the
+    local snapshot, then the same reads with Redis unreachable.
+    """
+    # Off while seeding and for the Redis run, so no background refresh interferes
+    db.SNAPSHOT_DIR = ''
+    seed_terms(client, args.terms)
+    ns = db.get_namespace()
+    ns.term_cache.maxsize = 0
+    names = [f'term{i:06d}' for i in range(0, args.terms, max(1, args.terms // 100))]
+
+    def lookups():
+        for name in names:
+            assert db.get_term(name) is not None
+        return len(names)
+
+    def suggestion_index():
+        ns.suggestion_index = (db._UNSET, (), ())
+        return len(db._get_suggestion_index(ns)[1])
+
+    reads = (
+        ('get_term', lookups),
+        ('get_all_terms', lambda: len(db.get_all_terms())),
+        ('suggestion index', suggestion_index),
+    )
+
+    def run(mode):
+        for name, func in reads:
+            with counter.measure() as result:
+                start = time.perf_counter()
+                count = func()
+                elapsed = time.perf_counter() - start
+            print(f"{name:<18} {mode:<9} {count:>8} {result['round_trips']:>12} {elapsed * 1000:>10.1f}")
+
+    print(f"{'read':<18} {'source':<9} {'results':>8} {'round trips':>12} {'ms':>10}")
+    run('redis')
+    with tempfile.TemporaryDirectory(prefix='whatis-snapshot-') as snapshot_dir:
+        db.SNAPSHOT_DIR = snapshot_dir
+        try:
+            with counter.measure() as result:
+                start = time.perf_counter()
+                db.refresh_snapshot()
+                elapsed = time.perf_counter() - start
+            print(f"{'refresh_snapshot':<18} {'':<9} {args.terms:>8} {result['round_trips']:>12} "
+                  f"{elapsed * 1000:>10.1f}")
+            run('snapshot')
+
+            # A worker that lost Redis (and is backing off) answers from the file
+            db.redis_client = None
+            db._connect_state['next_attempt_at'] = float('inf')
+            try:
+                run('outage')
+            finally:
+                db.redis_client = client
+                db._connect_state['next_attempt_at'] = 0.0
+        finally:
+            db.SNAPSHOT_DIR = ''
+
+# Share of each request kind in the load test
+LOAD_MIX = (
+    ('hit', 0.60),
+    ('typo', 0.15),
+    ('miss', 0.15),
+    ('admin', 0.05),
+    ('analytics', 0.05),
+)
+
+
+def load_request(kind, rng, term_count, sequence):
+    """Return (method, path, form data) for one request of the given kind."""
+    if kind == 'admin':
+        return 'GET', '/admin', None
+    if kind == 'analytics':
+        return 'GET', '/admin/analytics', None
+    name = f'TERM{rng.randrange(term_count):06d}'
+    if kind == 'typo':
+        # One wrong digit: no prefix completion, so suggestions need the fuzzy scan
+        position = rng.randrange(4, len(name))
+        name = name[:position] + 'X' + name[position + 1:]
+    elif kind == 'miss':
+        name = ''.join(rng.choice('bcdfghjklmnpqrstvwxz') for _ in range(8))
+    elif rng.random() < 0.5:
+        name = name.lower()
+    # No response_url, so suggestions are built inline rather than deferred
+    return 'POST', '/slack/command', {
+        'token': 'x',
+        'team_id': 'T0001',
+        'user_id': f'U{rng.randrange(1000):04d}',
+        'command': '/whatis',
+        'text': name,
+        'trigger_id': str(sequence)
+    }
+
+
+def flask_sender():
+    """Per-thread senders that call the app in-process through the test client."""
+    from app import app
+
+    def make_sender():
+        test_client = app.test_client()
+
+        def send(method, path, data):
+            return test_client.open(path, method=method, data=data).status_code
+        return send
+    return make_sender
+
+
+def asgi_sender(client, fake):
+    """
+    Per-thread senders that call asgi.application in-process. Requests from
+    every thread run concurrently on one event loop, as under uvicorn.
+    """
+    import asyncio
+    import database_async
+    from asgi import application
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name='asgi-loop', daemon=True).start()
+    if fake:
+        import fakeredis
+
+        async def connect_fake():
+            server = client.connection_pool.connection_kwargs['server']
+            database_async.redis_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        asyncio.run_coroutine_threadsafe(connect_fake(), loop).result()
+
+    async def call(method, path, body):
+        received = False
+        status = []
+
+        async def receive():
+            nonlocal received
+            if received:
+                return {'type': 'http.disconnect'}
+            received = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        headers = [(b'host', b'benchmark')]
+        if body:
+            headers.append((b'content-type', b'application/x-www-form-urlencoded'))
+        await application({
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': b'',
+            'headers': headers, 'client': ('127.0.0.1', 0), 'server': ('benchmark', 80)
+        }, receive, send)
+        return status[0]
+
+    def make_sender():
+        def send(method, path, data):
+            body = urlencode(data).encode() if data is not None else b''
+            return asyncio.run_coroutine_threadsafe(call(method, path, body), loop).result()
+        return send
+    return make_sender
+
+
+def http_sender(base_url):
+    """
+    Per-thread senders that call a running server over HTTP.
+
+    Slack requests are signed when SLACK_SIGNING_SECRET is set; each body
+    carries a unique trigger_id so signatures are never replays.
+    """
+    import hashlib
+    import hmac
+    import requests
+
+    secret = os.getenv('SLACK_SIGNING_SECRET')
+
+    def make_sender():
+        session = requests.Session()
+
+        def send(method, path, data):
+            headers = {}
+            body = None
+            if data is not None:
+                body = urlencode(data).encode()
+                headers['Content-Type'] = 'application/x-www-form-urlencoded'
+                if secret and path.startswith('/slack/'):
+                    timestamp = str(int(time.time()))
+                    headers['X-Slack-Request-Timestamp'] = timestamp
+                    headers['X-Slack-Signature'] = 'v0=' + hmac.new(
+                        secret.encode(), f'v0:{timestamp}:'.encode() + body, hashlib.sha256).hexdigest()
+            return session.request(method, base_url + path, data=body, headers=headers, timeout=30).status_code
+        return send
+    return make_sender
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run_load(make_sender, counter, term_count, args):
+    """Drive the load mix from args.threads threads and summarise each request kind."""
+    kinds = [kind for kind, _ in LOAD_MIX]
+    weights = [weight for _, weight in LOAD_MIX]
+    samples = {kind: [] for kind in kinds}
+    round_trips = Counter()
+    errors = Counter()
+    lock = threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        send = make_sender()
+        for i in range(args.requests):
+            kind = rng.choices(kinds, weights)[0]
+            method, path, data = load_request(kind, rng, term_count, seed * args.requests + i)
+            before = counter.thread_count()
+            start = time.perf_counter()
+            try:
+                failed = send(method, path, data) >= 400
+            except Exception:
+                failed = True
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples[kind].append(elapsed)
+                round_trips[kind] += counter.thread_count() - before
+                errors[kind] += failed
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(args.threads)]
+    trips_before = counter.count
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    total_round_trips = counter.count - trips_before
+    # Only sync round trips made by the sending thread can be attributed to a request
+    counted = not args.url and not args.asgi
+
+    total = sum(len(values) for values in samples.values())
+    result = {
+        'requests': total,
+        'seconds': elapsed,
+        'throughput': total / elapsed if elapsed else 0.0,
+        # Includes background threads such as the query log writer
+        'round_trips_per_request': total_round_trips / total if total and counted else None,
+        'kinds': {}
+    }
+    for kind in kinds:
+        values = sorted(samples[kind])
+        if not values:
+            continue
+        result['kinds'][kind] = {
+            'requests': len(values),
+            'errors': errors[kind],
+            'p50_ms': percentile(values, 0.50) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+            'round_trips_per_request': round_trips[kind] / len(values) if counted else None
+        }
+    return result
+
+
+def print_load_result(size, result):
+    print(f"\n{size} terms: {result['requests']} requests in {result['seconds']:.2f}s, "
+          f"{result['throughput']:.0f} req/s")
+    print(f"{'kind':<10} {'requests':>8} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8} {'round trips':>12}")
+    for kind, stats in result['kinds'].items():
+        trips = stats['round_trips_per_request']
+        trips = f"{trips:.2f}" if trips is not None else 'n/a'
+        print(f"{kind:<10} {stats['requests']:>8} {stats['errors']:>7} {stats['p50_ms']:>8.2f} "
+              f"{stats['p99_ms']:>8.2f} {trips:>12}")
+
+
+def compare_to_baseline(results, baseline, max_regression):
+    """Print latency and throughput changes; return the regressions over the threshold."""
+    regressions = []
+    print(f"\n{'size':>7} {'kind':<10} {'p50 ms':>17} {'p99 ms':>17}")
+    for size, result in results['sizes'].items():
+        previous = baseline.get('sizes', {}).get(size)
+        if previous is None:
+            continue
+        for kind, stats in result['kinds'].items():
+            old = previous['kinds'].get(kind)
+            if old is None:
+                continue
+            cells = []
+            for metric in ('p50_ms', 'p99_ms'):
+                change = stats[metric] / old[metric] - 1 if old[metric] else 0.0
+                cells.append(f"{old[metric]:.2f}->{stats[metric]:.2f} {change:+.0%}")
+                if change > max_regression:
+                    regressions.append(f"{size} terms {kind} {metric} {change:+.0%}")
+            print(f"{size:>7} {kind:<10} {cells[0]:>17} {cells[1]:>17}")
+        change = result['throughput'] / previous['throughput'] - 1 if previous['throughput'] else 0.0
+        print(f"{size:>7} {'throughput':<10} {previous['throughput']:.0f}->{result['throughput']:.0f} req/s "
+              f"{change:+.0%}")
+        if -change > max_regression:
+            regressions.append(f"{size} terms throughput {change:+.0%}")
+    return regressions
+
+
+def bench_load(client, counter, args):
+    """
+    Load-test /slack/command (hits, typos, misses), /admin and /admin/analytics
+    for each glossary size, in-process (the Flask app, or asgi.py with --asgi)
+    or against a server given by --url.
+    """
+    if args.url and args.fake:
+        raise SystemExit("--url drives a separate server, which can't share a --fake Redis")
+    if args.url and args.asgi:
+        raise SystemExit("--asgi runs asgi.py in-process; to load-test a uvicorn server, use --url")
+    # Signature checks and rate limits have their own benchmarks; keep them out of the lookup numbers
+    os.environ.setdefault('SLACK_VERIFY_REQUESTS', 'false')
+    os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+    if args.url:
+        make_sender, transport = http_sender(args.url.rstrip('/')), 'http'
+    elif args.asgi:
+        make_sender, transport = asgi_sender(client, args.fake), 'asgi'
+    else:
+        make_sender, transport = flask_sender(), 'test-client'
+
+    results = {
+        'transport': transport,
+        'threads': args.threads,
+        'requests_per_thread': args.requests,
+        'logs': args.logs,
+        'sizes': {}
+    }
+    for size in [int(size) for size in args.sizes.split(',')]:
+        seed_start = time.perf_counter()
+        seed_terms(client, size)
+        seed_logs(client, args.logs, size)
+        print(f"Seeded {size} terms and {args.logs} log entries in {time.perf_counter() - seed_start:.1f}s")
+        result = run_load(make_sender, counter, size, args)
+        results['sizes'][str(size)] = result
+        print_load_result(size, result)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved baseline to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.max_regression)
+        if regressions:
+            print(f"\nRegressions over {args.max_regression:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            raise SystemExit(1)
+        print(f"\nNo regressions over {args.max_regression:.0%}")
+
+
+BENCHMARKS = {
+    'verify': bench_verify,
+    'stress': bench_stress,
+    'bulk-read': bench_bulk_read,
+    'storage-format': bench_storage_format,
+    'load': bench_load,
+    'response-cache': bench_response_cache,
+    'snapshot': bench_snapshot,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--fake', action='store_true', help='use an in-memory fakeredis server')
+    parser.add_argument('--terms', type=int, default=10000, help='synthetic glossary size')
+    parser.add_argument('--threads', type=int, default=16, help='concurrent clients for stress and load')
+    parser.add_argument('--requests', type=int, default=200, help='requests per thread for stress and load')
+    parser.add_argument('--stress-terms', type=int, default=10, help='distinct terms the stress test contends on')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='comma-separated glossary sizes for load')
+    parser.add_argument('--logs', type=int, default=100000, help='synthetic query log entries seeded for load')
+    parser.add_argument('--url', help='load-test a running server at this base URL instead of in-process')
+    parser.add_argument('--asgi', action='store_true', help='load-test asgi.py in-process instead of the Flask app')
+    parser.add_argument('--save-baseline', metavar='FILE', help='write load results to FILE as JSON')
+    parser.add_argument('--baseline', metavar='FILE', help='compare load results with a saved baseline')
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help='fail when p50/p99 or throughput is worse than the baseline by this fraction')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    args = parser.parse_args()
+
+    client = make_client(args.fake)
+    db.redis_client = client
+    counter = RoundTripCounter(client)
+    counter.install()
+    try:
+        BENCHMARKS[args.benchmark](client, counter, args)
+    finally:
+        counter.uninstall()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Streaming NDJSON and CSV codecs for bulk glossary import and export.
+
+Parsers read a text stream line by line and yield one row dict per record,
+so an upload is never held in memory as a whole. Each row carries its line
+number, and either `term`/`definition` or an `error` message.
+"""
+
+import csv
+import io
+import json
+
+FORMATS = ('ndjson', 'csv')
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+EXPORT_FIELDS = ('term', 'definition', 'created_at', 'updated_at')
+
+
+def _make_row(line, term, definition):
+    term = term.strip() if isinstance(term, str) else ''
+    definition = definition.strip() if isinstance(definition, str) else ''
+    if not term or not definition:
+        return {'line': line, 'error': 'Both term and definition are required'}
+    return {'line': line, 'term': term, 'definition': definition}
+
+
+def parse_ndjson(stream):
+    """Yield rows from one JSON object per line; blank lines are skipped."""
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError as e:
+            yield {'line': line, 'error': f'Invalid JSON: {e}'}
+            continue
+        if not isinstance(record, dict):
+            yield {'line': line, 'error': 'Expected a JSON object'}
+            continue
+        yield _make_row(line, record.get('term'), record.get('definition'))
+
+
+def parse_csv(stream):
+    """Yield rows from CSV with a header row containing `term` and `definition` columns."""
+    reader = csv.DictReader(stream)
+    if reader.fieldnames is None:
+        return
+    missing = {'term', 'definition'} - {name.strip() for name in reader.fieldnames}
+    if missing:
+        yield {'line': 1, 'error': f"Missing columns: {', '.join(sorted(missing))}"}
+        return
+    for record in reader:
+        record = {key.strip(): value for key, value in record.items() if key}
+        yield _make_row(reader.line_num, record.get('term'), record.get('definition'))
+
+
+def parse(stream, fmt):
+    """Parse a text stream in the given format."""
+    if fmt == 'csv':
+        return parse_csv(stream)
+    return parse_ndjson(stream)
+
+
+def export_ndjson(terms):
+    """Yield one NDJSON line per term."""
+    for term_data in terms:
+        yield json.dumps({field: term_data[field] for field in EXPORT_FIELDS if field in term_data}) + '\n'
+
+
+def export_csv(terms):
+    """Yield a CSV header followed by one line per term."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    yield buffer.getvalue()
+    for term_data in terms:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(term_data)
+        yield buffer.getvalue()
+
+
+def export(terms, fmt):
+    """Serialize an iterable of term dicts in the given format, one chunk at a time."""
+    if fmt == 'csv':
+        return export_csv(terms)
+    return export_ndjson(terms)
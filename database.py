@@ -1,87 +1,548 @@
 import os
 import json
-from datetime import datetime
-from rapidfuzz import fuzz
+import calendar
+from datetime import datetime, timedelta
 import redis
 import logging
 import sys
 import traceback
 import time
+import threading
+import re
+import secrets
+from collections import OrderedDict
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
+from cache import LRUCache, MISSING
+import glossary_snapshot
+import startup_profile
+import search
+import metrics
+
+# Set up logging; LOG_LEVEL=DEBUG for verbose output
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
 
-# Redis configuration with retry mechanism
-MAX_RETRIES = 3
-RETRY_DELAY = 1  # seconds
+# Redis connection pool configuration. The pool is created lazily on first
+# use; if Redis is unreachable, callers get no client until an exponential
+# backoff delay has passed instead of sleeping in-line.
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', '10'))
+REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', '2.0'))  # seconds
+REDIS_CONNECT_TIMEOUT = float(os.getenv('REDIS_CONNECT_TIMEOUT', '2.0'))  # seconds
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', '30'))  # seconds
+RETRY_BASE_DELAY = float(os.getenv('REDIS_RETRY_BASE_DELAY', '0.5'))  # seconds
+RETRY_MAX_DELAY = float(os.getenv('REDIS_RETRY_MAX_DELAY', '30'))  # seconds
+# A warning is logged when connecting plus init_db takes longer than this
+COLD_START_BUDGET_MS = float(os.getenv('REDIS_COLD_START_BUDGET_MS', '500'))
 
-def get_redis_client():
-    """Create and return a Redis client with retries."""
+# Number of keys fetched per SCAN/MGET round trip when reading many terms
+TERM_BATCH_SIZE = int(os.getenv('TERM_BATCH_SIZE', '500'))
+# Number of rows written per pipelined round trip by import_terms
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '500'))
+# import_terms stops listing per-row errors after this many (they are still counted)
+MAX_IMPORT_ERRORS = 1000
+# A substring search in list_terms returns its page after this many ZSCAN calls,
+# even a short or empty one, so a rare query never walks the whole index in one request
+LIST_TERMS_MAX_SCANS = int(os.getenv('LIST_TERMS_MAX_SCANS', '10'))
+
+redis_client = None
+_connect_lock = threading.Lock()
+_connect_state = {'failures': 0, 'next_attempt_at': 0.0, 'cold_start_ms': None}
+
+def get_redis_url():
+    """Return the configured Redis URL with a scheme."""
     redis_url = os.getenv('REDIS_TLS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379'))
     
     # Ensure URL has proper scheme
     if not redis_url.startswith(('redis://', 'rediss://', 'unix://')):
         redis_url = f"rediss://{redis_url}" if 'REDIS_TLS_URL' in os.environ else f"redis://{redis_url}"
-    
-    logger.debug("Attempting to connect to Redis...")
-    logger.debug(f"Environment variables present: REDIS_TLS_URL={'REDIS_TLS_URL' in os.environ}, REDIS_URL={'REDIS_URL' in os.environ}")
-    
-    for attempt in range(MAX_RETRIES):
+    return redis_url
+
+def create_connection_pool(redis_url=None, pool_class=redis.ConnectionPool, max_connections=None):
+    """
+    Build an explicitly sized connection pool for the configured Redis.
+    database_async passes redis.asyncio's pool class to share the settings.
+    """
+    redis_url = redis_url or get_redis_url()
+    options = {
+        'max_connections': max_connections or REDIS_MAX_CONNECTIONS,
+        'socket_timeout': REDIS_SOCKET_TIMEOUT,
+        'socket_connect_timeout': REDIS_CONNECT_TIMEOUT,
+        'health_check_interval': REDIS_HEALTH_CHECK_INTERVAL,
+        'decode_responses': True
+    }
+    if redis_url.startswith('rediss://'):
+        # Managed Redis (e.g. Upstash) presents certificates we don't verify
+        options['ssl_cert_reqs'] = None
+    pool = pool_class.from_url(redis_url, **options)
+    # Count round trips per database function for /metrics
+    pool.connection_class = metrics.instrument_connection_class(pool.connection_class)
+    return pool
+
+def get_redis_client():
+    """
+    Return the shared Redis client, connecting and running init_db on first use.
+
+    Returns None while backing off after a failed connection attempt.
+    """
+    global redis_client
+    if redis_client is not None:
+        return redis_client
+    if time.monotonic() < _connect_state['next_attempt_at']:
+        return None
+
+    with _connect_lock:
+        if redis_client is not None:
+            return redis_client
+        start = time.perf_counter()
         try:
-            # Configure Redis client with SSL/TLS for Upstash
-            client = redis.from_url(
-                redis_url,
-                ssl=True,
-                ssl_cert_reqs=None,
-                decode_responses=True
-            )
-            # Test the connection
-            client.ping()
-            logger.debug(f"Successfully connected to Redis on attempt {attempt + 1}")
-            return client
+            with startup_profile.phase('redis connect'):
+                client = redis.Redis(connection_pool=create_connection_pool())
+                client.ping()
         except Exception as e:
-            logger.error(f"Redis connection attempt {attempt + 1} failed!")
-            logger.error(f"Error type: {type(e).__name__}")
-            logger.error(f"Error message: {str(e)}")
-            if attempt < MAX_RETRIES - 1:
-                logger.info(f"Retrying in {RETRY_DELAY} seconds...")
-                time.sleep(RETRY_DELAY)
-            else:
-                logger.error("All Redis connection attempts failed!")
-                logger.error(f"Traceback:\n{''.join(traceback.format_tb(sys.exc_info()[2]))}")
-                raise
-
-# Initialize Redis client
-try:
-    redis_client = get_redis_client()
-except Exception as e:
-    logger.error("Failed to initialize Redis client!")
-    logger.error(f"Error: {str(e)}")
-    redis_client = None
-
-def init_db():
+            _connect_state['failures'] += 1
+            delay = min(RETRY_BASE_DELAY * 2 ** (_connect_state['failures'] - 1), RETRY_MAX_DELAY)
+            _connect_state['next_attempt_at'] = time.monotonic() + delay
+            logger.error(f"Redis connection attempt {_connect_state['failures']} failed: "
+                         f"{type(e).__name__}: {str(e)}; next attempt in {delay:.1f}s")
+            return None
+
+        _connect_state['failures'] = 0
+        redis_client = client
+        with startup_profile.phase('init_db'):
+            init_db()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _connect_state['cold_start_ms'] = elapsed_ms
+        if elapsed_ms > COLD_START_BUDGET_MS:
+            logger.warning(f"Redis cold start took {elapsed_ms:.0f}ms, over the {COLD_START_BUDGET_MS:.0f}ms budget")
+        else:
+            logger.debug("Connected to Redis in %.0fms", elapsed_ms)
+        return redis_client
+
+def get_connection_stats():
+    """Return connection state, including how long the first connect + init_db took."""
+    return {
+        'connected': redis_client is not None,
+        'failures': _connect_state['failures'],
+        'cold_start_ms': _connect_state['cold_start_ms'],
+        'cold_start_budget_ms': COLD_START_BUDGET_MS
+    }
+
+def _redis():
+    """Return the Redis client or raise if it is unavailable."""
+    client = get_redis_client()
+    if client is None:
+        raise redis.exceptions.ConnectionError("Redis client is not initialized")
+    return client
+
+# Raised (by the sync and asyncio clients alike) when Redis can't be reached,
+# as opposed to errors in a command
+_UNAVAILABLE_ERRORS = (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError)
+
+# Bumped on every glossary write so worker-local caches know when to rebuild
+TERMS_VERSION_KEY = 'terms:version'
+# Sorted set of every term name, for paging and prefix search
+TERMS_INDEX_KEY = 'terms:index'
+# Largest code point; appended to a prefix to get the end of its lex range
+_LEX_MAX = '\U0010ffff'
+# Hash of normalized name or alias (search.normalize) -> lowercased term name
+ALIASES_KEY = 'terms:aliases'
+
+# Full-text search index: postings at search:idx:<token>, per-term token
+# lists at search:doc:<name>, and BM25 statistics in search:stats
+SEARCH_POSTING_PREFIX = 'search:idx:'
+SEARCH_DOC_PREFIX = 'search:doc:'
+SEARCH_STATS_KEY = 'search:stats'
+
+def _term_write_keys(term, ns):
+    """KEYS passed to every term write script."""
+    name = term.lower()
+    return [ns.term_key(name), ns.key('terms:count'), ns.key(TERMS_VERSION_KEY), ns.key(TERMS_INDEX_KEY),
+            ns.key(f'{SEARCH_DOC_PREFIX}{name}'), ns.key(SEARCH_STATS_KEY), ns.key(ALIASES_KEY)]
+
+def _search_payload(ns, term=None, definition=None):
+    """JSON argument for the search-index Lua helpers; only the prefix when removing."""
+    payload = {'prefix': ns.key(SEARCH_POSTING_PREFIX)}
+    if term is not None:
+        payload.update(search.document_payload(term, definition))
+    return json.dumps(payload)
+
+def _alias_payload(term, aliases=None):
+    """
+    JSON argument for the alias Lua helpers: the term's normalized name, and
+    when `aliases` is given, the explicit aliases that replace its current ones.
+    """
+    payload = {'name_key': search.normalize(term)}
+    if aliases is not None:
+        keys = {}
+        for alias in aliases:
+            alias = alias.strip()
+            key = search.normalize(alias)
+            # Variants of the name itself resolve already
+            if key and key != payload['name_key'] and key not in keys:
+                keys[key] = alias
+        payload['keys'] = list(keys)
+        payload['aliases'] = list(keys.values())
+    return json.dumps(payload)
+
+class AliasConflictError(ValueError):
+    """Raised when aliases already resolve to a different term."""
+
+    def __init__(self, aliases):
+        super().__init__(f"Aliases already used by another term: {', '.join(aliases)}")
+        self.aliases = aliases
+
+# Terms are stored as hashes at term:<lowercased name> with the fields
+# term, definition, created_at and (after an edit) updated_at. Older
+# deployments stored a JSON string at the same key; reads still accept it,
+# and writes convert it in place until `flask migrate-terms` has run.
+
+# Lua helper that converts a legacy JSON string term into a hash in place
+_LUA_TO_HASH = """
+local function to_hash(key)
+    if redis.call('TYPE', key).ok == 'string' then
+        local data = cjson.decode(redis.call('GET', key))
+        redis.call('DEL', key)
+        for field, value in pairs(data) do
+            if value ~= cjson.null then
+                redis.call('HSET', key, field, tostring(value))
+            end
+        end
+    end
+end
+"""
+
+# Lua helpers that keep the sorted-set name index (TERMS_INDEX_KEY) in step
+# with the term hashes. Members are "<lowercased name>\0<display name>" so
+# ZRANGEBYLEX can page and prefix-match on the lowercased name while still
+# returning the name as it was entered.
+_LUA_INDEX = """
+local function unindex_term(index_key, name)
+    local members = redis.call('ZRANGEBYLEX', index_key, '[' .. name .. '\\0', '(' .. name .. '\\1')
+    if #members > 0 then
+        redis.call('ZREM', index_key, unpack(members))
+    end
+end
+local function index_term(index_key, name, display)
+    unindex_term(index_key, name)
+    redis.call('ZADD', index_key, 0, name .. '\\0' .. display)
+end
+"""
+
+# Lua helpers that keep the full-text inverted index in step with the term
+# hashes. Each token has a posting hash <prefix><token> mapping lowercased
+# term name -> "tf:doc_length"; the per-term hash at search:doc:<name>
+# remembers which postings to remove on the next update or delete, and
+# search:stats holds the document count and total length for BM25. The
+# search payload is JSON built by _search_payload.
+_LUA_SEARCH = """
+local function unindex_doc(doc_key, stats_key, prefix, name)
+    local old = redis.call('HGETALL', doc_key)
+    if #old == 0 then
+        return
+    end
+    local length = 0
+    for i = 1, #old, 2 do
+        redis.call('HDEL', prefix .. old[i], name)
+        length = length + tonumber(old[i + 1])
+    end
+    redis.call('DEL', doc_key)
+    redis.call('HINCRBY', stats_key, 'docs', -1)
+    redis.call('HINCRBY', stats_key, 'length', -length)
+end
+local function index_doc(doc_key, stats_key, name, payload)
+    local search = cjson.decode(payload)
+    unindex_doc(doc_key, stats_key, search.prefix, name)
+    if search.len == 0 then
+        return
+    end
+    for token, tf in pairs(search.tf) do
+        redis.call('HSET', search.prefix .. token, name, tf .. ':' .. search.len)
+        redis.call('HSET', doc_key, token, tf)
+    end
+    redis.call('HINCRBY', stats_key, 'docs', 1)
+    redis.call('HINCRBY', stats_key, 'length', search.len)
+end
+"""
+
+# Lua helpers that keep the alias index (ALIASES_KEY) in step with the term
+# hashes. Each term's normalized name maps to it unless another term got
+# there first; explicit aliases are exclusive. A term hash remembers its
+# aliases (as entered) and their normalized keys in the JSON list fields
+# aliases and alias_keys. The alias payload is JSON built by _alias_payload;
+# without an aliases list the term's current aliases are kept.
+_LUA_ALIASES = """
+local function alias_conflicts(aliases_key, name, alias)
+    local conflicts = {}
+    for i, key in ipairs(alias.keys or {}) do
+        local owner = redis.call('HGET', aliases_key, key)
+        if owner and owner ~= name then
+            table.insert(conflicts, alias.aliases[i])
+        end
+    end
+    return conflicts
+end
+local function unalias_term(aliases_key, term_key, name, alias)
+    local keys = {alias.name_key}
+    if redis.call('TYPE', term_key).ok == 'hash' then
+        local old = redis.call('HGET', term_key, 'alias_keys')
+        if old then
+            for _, key in ipairs(cjson.decode(old)) do
+                table.insert(keys, key)
+            end
+        end
+    end
+    for _, key in ipairs(keys) do
+        if redis.call('HGET', aliases_key, key) == name then
+            redis.call('HDEL', aliases_key, key)
+        end
+    end
+end
+local function alias_term(aliases_key, term_key, name, alias)
+    if alias.keys then
+        unalias_term(aliases_key, term_key, name, alias)
+        for _, key in ipairs(alias.keys) do
+            redis.call('HSET', aliases_key, key, name)
+        end
+        redis.call('HSET', term_key, 'aliases', cjson.encode(alias.aliases), 'alias_keys', cjson.encode(alias.keys))
+    end
+    if alias.name_key ~= '' then
+        redis.call('HSETNX', aliases_key, alias.name_key, name)
+    end
+end
+"""
+
+# Every write script takes the keys from _term_write_keys:
+# KEYS: term key, terms:count, terms:version, terms:index, search doc key, search:stats, terms:aliases
+# Scripts that take aliases return the conflicting ones, without writing
+# anything, when another term already owns any of them.
+_SCRIPTS = {
+    # ARGV: term, definition, created_at, lowercased term, search payload, alias payload
+    'add_term': _LUA_INDEX + _LUA_SEARCH + _LUA_ALIASES + """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+local alias = cjson.decode(ARGV[6])
+local conflicts = alias_conflicts(KEYS[7], ARGV[4], alias)
+if #conflicts > 0 then
+    return conflicts
+end
+redis.call('HSET', KEYS[1], 'term', ARGV[1], 'definition', ARGV[2], 'created_at', ARGV[3])
+index_term(KEYS[4], ARGV[4], ARGV[1])
+index_doc(KEYS[5], KEYS[6], ARGV[4], ARGV[5])
+alias_term(KEYS[7], KEYS[1], ARGV[4], alias)
+redis.call('INCR', KEYS[2])
+redis.call('INCR', KEYS[3])
+return 1
+""",
+    # ARGV: term, definition, now, lowercased term, search payload, alias payload
+    # Returns 1 if the term was created, 2 if an existing term was overwritten
+    'upsert_term': _LUA_TO_HASH + _LUA_INDEX + _LUA_SEARCH + _LUA_ALIASES + """
+local created = redis.call('EXISTS', KEYS[1]) == 0
+if created then
+    redis.call('HSET', KEYS[1], 'term', ARGV[1], 'definition', ARGV[2], 'created_at', ARGV[3])
+    redis.call('INCR', KEYS[2])
+else
+    to_hash(KEYS[1])
+    redis.call('HSET', KEYS[1], 'term', ARGV[1], 'definition', ARGV[2], 'updated_at', ARGV[3])
+end
+index_term(KEYS[4], ARGV[4], ARGV[1])
+index_doc(KEYS[5], KEYS[6], ARGV[4], ARGV[5])
+alias_term(KEYS[7], KEYS[1], ARGV[4], cjson.decode(ARGV[6]))
+redis.call('INCR', KEYS[3])
+if created then
+    return 1
+end
+return 2
+""",
+    # ARGV: lowercased term, search payload, alias payload
+    'delete_term': _LUA_INDEX + _LUA_SEARCH + _LUA_ALIASES + """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+unalias_term(KEYS[7], KEYS[1], ARGV[1], cjson.decode(ARGV[3]))
+redis.call('DEL', KEYS[1])
+unindex_term(KEYS[4], ARGV[1])
+unindex_doc(KEYS[5], KEYS[6], cjson.decode(ARGV[2]).prefix, ARGV[1])
+redis.call('DECR', KEYS[2])
+redis.call('INCR', KEYS[3])
+return 1
+""",
+    # ARGV: definition, updated_at, lowercased term, search payload, optional alias payload
+    'update_term': _LUA_TO_HASH + _LUA_SEARCH + _LUA_ALIASES + """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local alias = ARGV[5] and cjson.decode(ARGV[5])
+if alias then
+    local conflicts = alias_conflicts(KEYS[7], ARGV[3], alias)
+    if #conflicts > 0 then
+        return conflicts
+    end
+end
+to_hash(KEYS[1])
+redis.call('HSET', KEYS[1], 'definition', ARGV[1], 'updated_at', ARGV[2])
+index_doc(KEYS[5], KEYS[6], ARGV[3], ARGV[4])
+if alias then
+    alias_term(KEYS[7], KEYS[1], ARGV[3], alias)
+end
+redis.call('INCR', KEYS[3])
+return 1
+""",
+    # Same keys as update_term; ARGV: lowercased term, alias payload
+    'set_aliases': _LUA_TO_HASH + _LUA_ALIASES + """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local alias = cjson.decode(ARGV[2])
+local conflicts = alias_conflicts(KEYS[7], ARGV[1], alias)
+if #conflicts > 0 then
+    return conflicts
+end
+to_hash(KEYS[1])
+alias_term(KEYS[7], KEYS[1], ARGV[1], alias)
+redis.call('INCR', KEYS[3])
+return 1
+""",
+    # KEYS: term key, terms:aliases; ARGV: normalized term, term key prefix
+    # Returns the exact match, else the term the normalized form is an alias
+    # of: a flat HGETALL list, a legacy JSON string, or nil.
+    'resolve_term': """
+local function read(key)
+    local key_type = redis.call('TYPE', key).ok
+    if key_type == 'hash' then
+        return redis.call('HGETALL', key)
+    elseif key_type == 'string' then
+        return redis.call('GET', key)
+    end
+    return false
+end
+local found = read(KEYS[1])
+if found or ARGV[1] == '' then
+    return found
+end
+local name = redis.call('HGET', KEYS[2], ARGV[1])
+if name then
+    return read(ARGV[2] .. name)
+end
+return false
+""",
+    # KEYS: search doc key, search:stats; ARGV: lowercased term, search payload
+    'index_doc': _LUA_SEARCH + """
+index_doc(KEYS[1], KEYS[2], ARGV[1], ARGV[2])
+return 1
+""",
+    # KEYS: lock key; ARGV: the token it was taken with
+    # Deletes the lock only if it is still ours, not one taken after ours expired
+    'release_lock': """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+""",
+    # KEYS: term key; returns 1 if a legacy string was converted
+    'migrate_term': _LUA_TO_HASH + """
+if redis.call('TYPE', KEYS[1]).ok ~= 'string' then
+    return 0
+end
+to_hash(KEYS[1])
+return 1
+""",
+}
+_registered_scripts = {}
+
+def _run_script(name, keys, args, client=None):
+    """Run one of the Lua scripts in _SCRIPTS, on a client or pipeline."""
+    client = client or _redis()
+    script = _registered_scripts.get(name)
+    if script is None:
+        script = _registered_scripts[name] = client.register_script(_SCRIPTS[name])
+    return script(keys=keys, args=args, client=client)
+
+def _is_wrong_type(result):
+    return isinstance(result, redis.exceptions.ResponseError) and 'WRONGTYPE' in str(result)
+
+def _decode_term(term_data):
+    """Turn a stored term hash into the dict callers see, with aliases as a list."""
+    term_data.pop('alias_keys', None)
+    if 'aliases' in term_data:
+        # Lua's cjson encodes an empty list as {}
+        term_data['aliases'] = list(json.loads(term_data['aliases']) or [])
+    return term_data
+
+def _read_term(term_key):
+    """Read one term hash (or legacy JSON string); None if it doesn't exist."""
+    try:
+        term_data = _redis().hgetall(term_key)
+    except redis.exceptions.ResponseError as e:
+        if not _is_wrong_type(e):
+            raise
+        term_data = _redis().get(term_key)
+        return json.loads(term_data) if term_data else None
+    return _decode_term(term_data) if term_data else None
+
+def _resolve_term(term, ns):
+    """
+    Read a term by exact name, falling back to the alias index, in one
+    round trip. None if neither matches.
+    """
+    return _decode_resolved(_run_script('resolve_term', **_resolve_arguments(term, ns)))
+
+def _resolve_arguments(term, ns):
+    return {'keys': [ns.term_key(term), ns.key(ALIASES_KEY)], 'args': [search.normalize(term), ns.key('term:')]}
+
+def _decode_resolved(result):
+    """Turn the resolve_term script's reply into a term dict or None."""
+    if not result:
+        return None
+    if isinstance(result, str):
+        return json.loads(result)
+    return _decode_term(dict(zip(result[::2], result[1::2])))
+
+def init_db(tenant=None):
     """
     Initialize the database if needed.
     For Redis, we don't need to create tables, but we can set up initial data.
+    Runs once per process for each namespace.
     """
-    if redis_client is None:
+    ns = get_namespace(tenant)
+    if ns.initialized:
+        return True
+    if get_redis_client() is None:
         logger.error("Cannot initialize database - Redis client is not initialized")
         return False
         
     try:
-        logger.debug("Checking if database needs initialization")
-        if not redis_client.exists('terms:count'):
-            redis_client.set('terms:count', 0)
+        logger.debug("Checking if database needs initialization for %s", ns)
+        pipe = _redis().pipeline(transaction=False)
+        pipe.set(ns.key('terms:count'), 0, nx=True)
+        pipe.get(ns.key('terms:count'))
+        pipe.exists(ns.key(TERMS_INDEX_KEY))
+        pipe.exists(ns.key(SEARCH_STATS_KEY))
+        pipe.exists(ns.key(ALIASES_KEY))
+        if ns.team_id:
+            pipe.sadd(TENANTS_KEY, ns.team_id)
+        created, count, has_index, has_search_index, has_aliases = pipe.execute()[:5]
+        if created:
             logger.debug("Database initialized with terms:count = 0")
-            # Add a test term to verify write operations
-            test_term = {
-                'term': 'test',
-                'definition': 'This is a test term.',
-                'created_at': datetime.utcnow().isoformat()
-            }
-            redis_client.set('term:test', json.dumps(test_term))
-            logger.debug("Test term added successfully")
+            _redis().hsetnx(ns.key(SEARCH_STATS_KEY), 'docs', 0)
+            if ns.team_id is None:
+                # Add a test term to verify write operations
+                add_term('test', 'This is a test term.')
+                logger.debug("Test term added successfully")
+        elif int(count or 0) > 0:
+            # Glossary written by a version without some of the indexes. They
+            # are rebuilt by an operator, not by every cold worker at once on
+            # request traffic.
+            for exists, command, effect in (
+                (has_index, 'rebuild-index',
+                 '/admin/terms, autocomplete, /slack/options and prefix suggestions are empty, '
+                 'and bulk reads fall back to SCAN'),
+                (has_search_index, 'rebuild-search-index', 'searches find nothing'),
+                (has_aliases, 'rebuild-alias-index', 'only exact names resolve'),
+            ):
+                if not exists:
+                    logger.warning(f"{ns} is missing an index; {effect} until `flask {command}` runs")
+        ns.initialized = True
         return True
     except Exception as e:
         logger.error("Database initialization error!")
@@ -90,110 +551,1112 @@ def init_db():
         logger.error(f"Traceback:\n{''.join(traceback.format_tb(sys.exc_info()[2]))}")
         return False
 
-def get_term(term):
-    """Get a term from the database."""
+
+# Read-through cache for get_term, including negative lookups. Entries are
+# dropped when terms:version moves; the version is re-read from Redis at
+# most once per TERM_CACHE_VERSION_INTERVAL seconds, which bounds how stale
+# another worker's write can look here.
+TERM_CACHE_SIZE = int(os.getenv('TERM_CACHE_SIZE', '1024'))
+TERM_CACHE_TTL = float(os.getenv('TERM_CACHE_TTL', '300'))
+TERM_CACHE_VERSION_INTERVAL = float(os.getenv('TERM_CACHE_VERSION_INTERVAL', '1.0'))
+# Pre-rendered slash command responses (serialized JSON bytes) for lookups
+# that missed, per lookup text; a found term is served by the term cache
+# just as cheaply, so hits aren't stored. Each entry is tagged with the terms:version it was rendered at and
+# ignored once the version moves, so an edit to a term or to any of the
+# terms a suggestion list was drawn from retires it. 0 disables the cache.
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '2048'))
+# Local read-only snapshot of each namespace's glossary (see
+# glossary_snapshot.py). get_term, find_similar_terms and get_all_terms read
+# it instead of Redis while it is at the current terms:version, and read it
+# as it stands while Redis is unreachable. When the version moves, a thread
+# rebuilds it, at most once per SNAPSHOT_REFRESH_INTERVAL seconds per
+# namespace. Off unless SNAPSHOT_DIR names a writable local directory
+# (the deploy bundle is read-only on serverless platforms; use /tmp there).
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', '')
+SNAPSHOT_REFRESH_INTERVAL = float(os.getenv('SNAPSHOT_REFRESH_INTERVAL', '30'))
+
+_UNSET = object()
+
+# Multi-tenancy. With MULTI_TENANT=true each Slack workspace (team_id) has
+# its own glossary, indexes, analytics and logs under the key prefix
+# t:{<team_id>}:. The braces are a Redis Cluster hash tag: all of one
+# workspace's keys, including the posting lists the Lua scripts derive from
+# a prefix, hash to one slot, while different workspaces spread across
+# shards. The default namespace (MULTI_TENANT off, no team_id, or
+# DEFAULT_TEAM_ID) keeps the original unprefixed keys.
+MULTI_TENANT = os.getenv('MULTI_TENANT', 'false').lower() == 'true'
+DEFAULT_TEAM_ID = os.getenv('DEFAULT_TEAM_ID', '')
+# Namespaces (and their caches) kept per worker before the least recently used is dropped
+MAX_CACHED_NAMESPACES = int(os.getenv('MAX_CACHED_NAMESPACES', '1000'))
+# Set of every team_id that has a namespace, for maintenance commands
+TENANTS_KEY = 'tenants'
+_TEAM_ID_RE = re.compile(r'[A-Za-z0-9_-]+')
+
+class Namespace:
+    """Key layout and worker-local caches for one workspace's data."""
+
+    def __init__(self, team_id=None):
+        self.team_id = team_id
+        self.prefix = f't:{{{team_id}}}:' if team_id else ''
+        self.initialized = False
+        self.term_cache = LRUCache(TERM_CACHE_SIZE, TERM_CACHE_TTL)
+        self.response_cache = LRUCache(RESPONSE_CACHE_SIZE, TERM_CACHE_TTL)
+        self.terms_version = {'value': _UNSET, 'checked_at': 0.0}
+        # Fuzzy suggestion index: (terms:version, normalized names, the term
+        # dicts they came from), replaced as a whole so readers never see a mix
+        self.suggestion_index = (_UNSET, (), ())
+        self.suggestion_lock = threading.Lock()
+        self.analytics_refresh_lock = threading.Lock()
+        # The glossary snapshot, opened from disk on first use
+        self.snapshot = {'store': None, 'opened': False, 'refreshing': False, 'refresh_started_at': None}
+        self.snapshot_lock = threading.Lock()
+
+    def __repr__(self):
+        return f'Namespace({self.team_id!r})'
+
+    def key(self, name):
+        """Return the Redis key for `name` in this namespace."""
+        return self.prefix + name
+
+    def term_key(self, term):
+        return f'{self.prefix}term:{term.lower()}'
+
+_namespaces = OrderedDict()
+_namespaces_lock = threading.Lock()
+
+def is_valid_team_id(team_id):
+    return bool(_TEAM_ID_RE.fullmatch(team_id or ''))
+
+def get_namespace(tenant=None):
+    """
+    Return the Namespace for a team_id; a Namespace is passed through.
+
+    Every team shares the default namespace unless MULTI_TENANT is on.
+    A workspace's namespace is initialized on first use in each process.
+    Raises ValueError for a malformed team_id.
+    """
+    if isinstance(tenant, Namespace):
+        return tenant
+    if not MULTI_TENANT or not tenant or tenant == DEFAULT_TEAM_ID:
+        tenant = None
+    elif not is_valid_team_id(tenant):
+        raise ValueError(f"Invalid team_id: {tenant!r}")
+    with _namespaces_lock:
+        ns = _namespaces.get(tenant)
+        if ns is None:
+            ns = _namespaces[tenant] = Namespace(tenant)
+            while len(_namespaces) > MAX_CACHED_NAMESPACES:
+                _namespaces.popitem(last=False)
+        else:
+            _namespaces.move_to_end(tenant)
+    # The default namespace is initialized when the client connects
+    if tenant is not None and not ns.initialized:
+        init_db(ns)
+    return ns
+
+def list_tenants():
+    """Return every namespace's team_id, None for the default one first."""
+    if not MULTI_TENANT:
+        return [None]
+    return [None] + sorted(_redis().smembers(TENANTS_KEY))
+
+def _terms_version_is_due(ns, now):
+    state = ns.terms_version
+    return state['value'] is _UNSET or now - state['checked_at'] >= TERM_CACHE_VERSION_INTERVAL
+
+def _record_terms_version(ns, version, now):
+    """Store a freshly read terms:version, clearing the term cache if it moved."""
+    state = ns.terms_version
+    if version != state['value']:
+        ns.term_cache.clear()
+        ns.response_cache.clear()
+    state['value'] = version
+    state['checked_at'] = now
+
+def _current_terms_version(ns):
+    """Return terms:version, cached locally for TERM_CACHE_VERSION_INTERVAL seconds."""
+    now = time.monotonic()
+    if _terms_version_is_due(ns, now):
+        _record_terms_version(ns, _redis().get(ns.key(TERMS_VERSION_KEY)), now)
+    return ns.terms_version['value']
+
+def _invalidate_local_caches(ns):
+    """Make this worker see its own write immediately."""
+    ns.term_cache.clear()
+    ns.response_cache.clear()
+    ns.terms_version['value'] = _UNSET
+    _schedule_snapshot_refresh(ns)
+
+def _bump_terms_version(ns):
+    """Invalidate worker-local term caches in every process."""
+    _redis().incr(ns.key(TERMS_VERSION_KEY))
+    _invalidate_local_caches(ns)
+
+def _sum_cache_stats(attribute, maxsize):
+    with _namespaces_lock:
+        caches = [getattr(ns, attribute).stats() for ns in _namespaces.values()]
+    stats = {'namespaces': len(caches), 'maxsize': maxsize, 'ttl': TERM_CACHE_TTL}
+    for field in ('size', 'hits', 'misses', 'evictions', 'expirations'):
+        stats[field] = sum(cache[field] for cache in caches)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+    return stats
+
+def get_term_cache_stats():
+    """Return hit/miss/eviction counters for the get_term caches, summed over namespaces."""
+    return _sum_cache_stats('term_cache', TERM_CACHE_SIZE)
+
+def get_response_cache_stats():
+    """Return counters for the pre-rendered response caches, summed over namespaces."""
+    return _sum_cache_stats('response_cache', RESPONSE_CACHE_SIZE)
+
+def cached_term(ns, key, version):
+    """Return the term dict (or None) cached for `key` at `version`, else MISSING."""
+    entry = ns.term_cache.get(key)
+    if entry is MISSING or entry[0] != version:
+        return MISSING
+    return entry[1]
+
+def cache_term(ns, key, version, term_data):
+    """
+    Remember a lookup read at `version`. Entries carry their version so a
+    read that finishes after a newer version was seen is never served.
+    """
+    if version is not _UNSET:
+        ns.term_cache.set(key, (version, term_data))
+
+def cached_response(ns, text, version):
+    """Return (found, body) pre-rendered for `text` at `version`, or None."""
+    entry = ns.response_cache.get(text.lower())
+    if entry is MISSING or entry[0] != version:
+        return None
+    return entry[1], entry[2]
+
+def get_cached_response(text, tenant=None):
+    """
+    Return (version, cached) for a slash command lookup: the current
+    terms:version, and (found, body) if a response was pre-rendered at that
+    version, else None. Pass the version to cache_response once the
+    response has been rendered, so an edit made meanwhile retires it.
+    """
     try:
-        term_key = f'term:{term.lower()}'
-        term_data = redis_client.get(term_key)
-        if term_data:
-            return json.loads(term_data)
+        ns = get_namespace(tenant)
+        version = _current_terms_version(ns)
+        return version, cached_response(ns, text, version)
+    except Exception as e:
+        logger.error(f"Error reading the response cache: {str(e)}")
+        return _UNSET, None
+
+def cache_response(text, version, found, body, tenant=None):
+    """Remember the serialized response for `text`, rendered from data read at `version`."""
+    if version is _UNSET:
+        return
+    get_namespace(tenant).response_cache.set(text.lower(), (version, found, body))
+
+_snapshot_stats = {'built': 0, 'adopted': 0, 'failures': 0}
+
+def snapshot_path(tenant=None):
+    """Return the snapshot file of a namespace, in a subdirectory per workspace."""
+    team_id = get_namespace(tenant).team_id
+    directory = os.path.join(SNAPSHOT_DIR, team_id) if team_id else SNAPSHOT_DIR
+    return os.path.join(directory, 'glossary.sqlite3')
+
+def _get_snapshot(ns):
+    """Return the namespace's snapshot, opening the file an earlier run left on first use."""
+    if not SNAPSHOT_DIR:
         return None
+    state = ns.snapshot
+    if not state['opened']:
+        with ns.snapshot_lock:
+            if not state['opened']:
+                state['store'] = glossary_snapshot.open_snapshot(snapshot_path(ns))
+                state['opened'] = True
+    return state['store']
+
+def _snapshot_at(ns, version):
+    """Return the snapshot if it was taken at `version`; else None, and a rebuild is scheduled."""
+    store = _get_snapshot(ns)
+    if store is not None and store.version == version:
+        metrics.snapshot_reads.inc('current')
+        return store
+    _schedule_snapshot_refresh(ns)
+    return None
+
+def _fallback_snapshot(ns, error):
+    """Return the snapshot to serve while Redis is unreachable; re-raise `error` if there is none."""
+    store = _get_snapshot(ns)
+    if store is None:
+        raise error
+    metrics.snapshot_reads.inc('fallback')
+    return store
+
+def _schedule_snapshot_refresh(ns):
+    """Start refresh_snapshot in a thread, unless one ran for the namespace recently."""
+    if not SNAPSHOT_DIR:
+        return
+    state = ns.snapshot
+    now = time.monotonic()
+    with ns.snapshot_lock:
+        started_at = state['refresh_started_at']
+        if state['refreshing'] or (started_at is not None and now - started_at < SNAPSHOT_REFRESH_INTERVAL):
+            return
+        state['refreshing'] = True
+        state['refresh_started_at'] = now
+    threading.Thread(target=_refresh_snapshot_in_background, args=(ns,), name='snapshot-refresh', daemon=True).start()
+
+def _refresh_snapshot_in_background(ns):
+    try:
+        refresh_snapshot(ns)
+    except Exception as e:
+        _snapshot_stats['failures'] += 1
+        logger.error(f"Error refreshing the glossary snapshot for {ns}: {type(e).__name__}: {str(e)}")
+    finally:
+        ns.snapshot['refreshing'] = False
+
+def _iter_aliases(ns):
+    """Yield the alias index as (normalized key, lowercased name) pairs, a batch per HSCAN."""
+    yield from _redis().hscan_iter(ns.key(ALIASES_KEY), count=TERM_BATCH_SIZE)
+
+@metrics.timed('refresh_snapshot')
+def refresh_snapshot(tenant=None):
+    """
+    Bring a namespace's snapshot up to the current terms:version and return
+    it: the file on disk if another worker already wrote it at that version,
+    else a new one built by SCANning the term keys, plus the alias index.
+    Terms are read by SCAN rather than from terms:index so the snapshot
+    holds every stored term even if the index is missing or incomplete.
+
+    The version is read before the terms, so a snapshot that raced a write
+    is labelled with the older version and rebuilt on the next read.
+    """
+    ns = get_namespace(tenant)
+    version = _redis().get(ns.key(TERMS_VERSION_KEY))
+    path = snapshot_path(ns)
+    store = glossary_snapshot.open_snapshot(path)
+    if store is not None and store.version == version:
+        _snapshot_stats['adopted'] += 1
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        store = glossary_snapshot.write(
+            path, version, _iter_scanned_terms(ns, TERM_BATCH_SIZE), _iter_aliases(ns))
+        _snapshot_stats['built'] += 1
+        logger.debug("Wrote glossary snapshot %s with %d terms at version %s", path, store.terms_count, version)
+    with ns.snapshot_lock:
+        ns.snapshot['store'] = store
+        ns.snapshot['opened'] = True
+    return store
+
+def get_snapshot_stats():
+    """Return snapshot settings, rebuild counters and the snapshots open in this worker."""
+    with _namespaces_lock:
+        stores = [ns.snapshot['store'] for ns in _namespaces.values() if ns.snapshot['store'] is not None]
+    return dict(
+        _snapshot_stats,
+        dir=SNAPSHOT_DIR or None,
+        refresh_interval=SNAPSHOT_REFRESH_INTERVAL,
+        open=len(stores),
+        terms=sum(store.terms_count for store in stores),
+        oldest_age_seconds=max((time.time() - store.built_at for store in stores), default=None)
+    )
+
+def _get_suggestion_index(ns):
+    """
+    Return (names, terms) for fuzzy matching, rebuilding it if the glossary
+    changed: from the snapshot when it is current, and from the snapshot as
+    it stands while Redis is unreachable.
+    """
+    try:
+        version = _current_terms_version(ns)
+        store = None
+    except _UNAVAILABLE_ERRORS as e:
+        store = _fallback_snapshot(ns, e)
+        version = store.version
+    index = ns.suggestion_index
+    if index[0] != version:
+        with ns.suggestion_lock:
+            index = ns.suggestion_index
+            if index[0] != version:
+                store = store or _snapshot_at(ns, version)
+                terms = tuple(store.terms() if store is not None else iter_terms(tenant=ns))
+                index = ns.suggestion_index = (version, tuple(t['term'].lower() for t in terms), terms)
+                logger.debug("Rebuilt suggestion index for %s with %d terms at version %s", ns, len(terms), version)
+    return index[1], index[2]
+
+@metrics.timed('get_term')
+def get_term(term, tenant=None):
+    """
+    Get a term by name or alias, via the worker-local cache. Variants that
+    normalize to a known name or alias (see search.normalize) resolve to
+    that term in the same round trip as the exact lookup, or with none when
+    the snapshot is current. While Redis is unreachable the snapshot answers.
+    """
+    try:
+        ns = get_namespace(tenant)
+        key = term.lower()
+        try:
+            version = _current_terms_version(ns)
+            term_data = cached_term(ns, key, version)
+            if term_data is not MISSING:
+                return term_data
+            store = _snapshot_at(ns, version)
+            term_data = store.get_term(key) if store is not None else _resolve_term(key, ns)
+        except _UNAVAILABLE_ERRORS as e:
+            return _fallback_snapshot(ns, e).get_term(key)
+        cache_term(ns, key, version, term_data)
+        return term_data
     except Exception as e:
         logger.error(f"Error getting term: {str(e)}")
         return None
 
-def find_similar_terms(term, threshold=80):
-    """Find similar terms."""
+@metrics.timed('find_similar_terms')
+def find_similar_terms(term, threshold=80, limit=None, tenant=None):
+    """Find similar terms, best match first."""
+    # Deferred so that rapidfuzz is only loaded by workers that see a miss
+    from rapidfuzz import fuzz, process
     try:
-        similar_terms = []
-        # Get all terms
-        for key in redis_client.scan_iter("term:*"):
-            term_data = redis_client.get(key)
-            if term_data:
-                term_obj = json.loads(term_data)
-                similarity = fuzz.ratio(term.lower(), term_obj['term'].lower())
-                if similarity >= threshold:
-                    similar_terms.append(term_obj)
-        
-        similar_terms.sort(key=lambda x: fuzz.ratio(term.lower(), x['term'].lower()), reverse=True)
-        return similar_terms
+        names, terms = _get_suggestion_index(get_namespace(tenant))
+        matches = process.extract(
+            term.lower(),
+            names,
+            scorer=fuzz.ratio,
+            limit=limit,
+            score_cutoff=threshold
+        )
+        return [terms[index] for _, _, index in matches]
     except Exception as e:
         logger.error(f"Error finding similar terms: {str(e)}")
         return []
 
-def log_query(user_id, term, found):
-    """Log a query."""
+# Pre-aggregated analytics, updated alongside every RPUSH onto a log list
+ANALYTICS_TERMS_KEY = 'analytics:terms'    # sorted set: term -> query count
+ANALYTICS_DAILY_KEY = 'analytics:daily'    # hash: YYYY-MM-DD -> query count
+ANALYTICS_USERS_KEY = 'analytics:users'    # HyperLogLog of user ids
+ANALYTICS_TOTAL_KEY = 'analytics:total'
+ANALYTICS_FOUND_KEY = 'analytics:found'
+# "/whatis search" queries are logged with kind 'search' and only counted
+# here, so they don't show up as term lookups in the counters above
+ANALYTICS_SEARCHES_KEY = 'analytics:searches'
+SEARCH_LOG_KIND = 'search'
+
+# Query logs are sharded into one list per UTC day at logs:YYYY-MM-DD, and
+# the days written are recorded in the logs:days set. Each day expires
+# LOG_RETENTION_DAYS after it ends (0 keeps days until they are archived);
+# `flask archive-logs` moves old days to compressed files on disk.
+LOG_KEY_PREFIX = 'logs:'
+LOG_DAYS_KEY = 'logs:days'
+LEGACY_LOG_KEY = 'logs'    # single unbounded list written by older versions
+LOG_RETENTION_DAYS = int(os.getenv('LOG_RETENTION_DAYS', '30'))
+
+def log_key(day, tenant=None):
+    """Return the Redis key holding a namespace's query log for a YYYY-MM-DD day."""
+    return get_namespace(tenant).key(f'{LOG_KEY_PREFIX}{day}')
+
+def log_day(log_data):
+    """Return the YYYY-MM-DD day a log entry belongs to."""
+    return log_data.get('timestamp', '').split('T')[0]
+
+def _log_expiry(day):
+    """Unix time at which a day's log key expires under the retention policy."""
+    expires = datetime.strptime(day, '%Y-%m-%d') + timedelta(days=LOG_RETENTION_DAYS + 1)
+    return calendar.timegm(expires.timetuple())
+
+def _queue_analytics(pipe, log_data, ns):
+    """Queue the aggregate counter updates for one log entry on a pipeline."""
+    if log_data.get('kind') == SEARCH_LOG_KIND:
+        pipe.incr(ns.key(ANALYTICS_SEARCHES_KEY))
+        return
+    pipe.zincrby(ns.key(ANALYTICS_TERMS_KEY), 1, log_data.get('term', ''))
+    pipe.hincrby(ns.key(ANALYTICS_DAILY_KEY), log_day(log_data), 1)
+    pipe.pfadd(ns.key(ANALYTICS_USERS_KEY), log_data.get('user_id', ''))
+    pipe.incr(ns.key(ANALYTICS_TOTAL_KEY))
+    if log_data.get('found', False):
+        pipe.incr(ns.key(ANALYTICS_FOUND_KEY))
+
+def make_log_entry(user_id, term, found, tenant=None, kind=None):
+    """
+    Build the log record stored for one query; it carries team_id outside
+    the default namespace, and `kind` for anything but a term lookup.
+    """
+    log_data = {
+        'user_id': user_id,
+        'term': term,
+        'found': found,
+        'timestamp': datetime.utcnow().isoformat()
+    }
+    if kind:
+        log_data['kind'] = kind
+    team_id = get_namespace(tenant).team_id
+    if team_id:
+        log_data['team_id'] = team_id
+    return log_data
+
+@metrics.timed('log_queries')
+def log_queries(entries):
+    """
+    Write a batch of log entries and their analytics in one round trip.
+
+    Entries may belong to different namespaces (by their team_id).
+    """
     try:
-        log_data = {
-            'user_id': user_id,
-            'term': term,
-            'found': found,
-            'timestamp': datetime.utcnow().isoformat()
-        }
-        redis_client.rpush('logs', json.dumps(log_data))
+        by_key = {}
+        for log_data in entries:
+            ns = get_namespace(log_data.get('team_id'))
+            day = log_day(log_data)
+            by_key.setdefault((ns, day), []).append(log_data)
+        pipe = _redis().pipeline(transaction=False)
+        for (ns, day), day_entries in by_key.items():
+            key = log_key(day, ns)
+            pipe.rpush(key, *[json.dumps(log_data) for log_data in day_entries])
+            pipe.sadd(ns.key(LOG_DAYS_KEY), day)
+            if LOG_RETENTION_DAYS > 0:
+                pipe.expireat(key, _log_expiry(day))
+            for log_data in day_entries:
+                _queue_analytics(pipe, log_data, ns)
+        pipe.execute()
+        return True
     except Exception as e:
-        logger.error(f"Error logging query: {str(e)}")
+        logger.error(f"Error logging {len(entries)} queries: {str(e)}")
+        return False
+
+def log_query(user_id, term, found, tenant=None, kind=None):
+    """Log a query."""
+    return log_queries([make_log_entry(user_id, term, found, tenant, kind)])
+
+@metrics.timed('get_analytics')
+def get_analytics(top_n=10, days=7, tenant=None):
+    """
+    Get usage analytics from the pre-aggregated counters in one round trip.
+
+    Unique users is a HyperLogLog estimate (standard error ~0.8%).
+    """
+    ns = get_namespace(tenant)
+    pipe = _redis().pipeline(transaction=False)
+    pipe.zrevrange(ns.key(ANALYTICS_TERMS_KEY), 0, top_n - 1, withscores=True)
+    pipe.hgetall(ns.key(ANALYTICS_DAILY_KEY))
+    pipe.pfcount(ns.key(ANALYTICS_USERS_KEY))
+    pipe.get(ns.key(ANALYTICS_TOTAL_KEY))
+    pipe.get(ns.key(ANALYTICS_FOUND_KEY))
+    pipe.get(ns.key(ANALYTICS_SEARCHES_KEY))
+    top_terms, daily, unique_users, total, found, searches = pipe.execute()
+
+    total_queries = int(total or 0)
+    found_count = int(found or 0)
+    return {
+        "top_terms": [{'term': term, 'count': int(count)} for term, count in top_terms],
+        "daily_queries": [
+            {'date': date, 'count': int(count)}
+            for date, count in sorted(daily.items(), reverse=True)[:days]
+        ],
+        "total_queries": total_queries,
+        "unique_users": unique_users,
+        "success_rate": (found_count / total_queries * 100) if total_queries > 0 else 0,
+        "search_queries": int(searches or 0)
+    }
+
+# Materialized /admin/analytics result, as a hash with `version` (the
+# analytics:total log offset it covers), `computed_at` and `data` (JSON)
+ANALYTICS_SNAPSHOT_KEY = 'analytics:snapshot'
+ANALYTICS_SNAPSHOT_LOCK_KEY = 'analytics:snapshot:lock'
+# A snapshot is served for this long (seconds) even if queries were logged since
+ANALYTICS_SNAPSHOT_MAX_AGE = float(os.getenv('ANALYTICS_SNAPSHOT_MAX_AGE', '30'))
+# Lifetime of the cross-process refresh lock, in case its holder dies
+ANALYTICS_REFRESH_LOCK_MS = 5000
+
+def _read_analytics_snapshot(ns):
+    """Return (current log offset, stored snapshot hash) in one round trip."""
+    pipe = _redis().pipeline(transaction=False)
+    pipe.get(ns.key(ANALYTICS_TOTAL_KEY))
+    pipe.hgetall(ns.key(ANALYTICS_SNAPSHOT_KEY))
+    total, snapshot = pipe.execute()
+    return int(total or 0), snapshot
+
+def _snapshot_is_fresh(snapshot, total):
+    if not snapshot:
+        return False
+    if int(snapshot['version']) == total:
+        return True
+    return time.time() - float(snapshot['computed_at']) < ANALYTICS_SNAPSHOT_MAX_AGE
+
+def _decode_snapshot(snapshot):
+    return {
+        'version': int(snapshot['version']),
+        'computed_at': float(snapshot['computed_at']),
+        'analytics': json.loads(snapshot['data'])
+    }
+
+@metrics.timed('get_analytics_snapshot')
+def get_analytics_snapshot(tenant=None):
+    """
+    Return the materialized analytics as {'version', 'computed_at', 'analytics'}.
+
+    `version` is the number of logged queries the snapshot covers. The
+    snapshot is refreshed only when queries were logged since and it is older
+    than ANALYTICS_SNAPSHOT_MAX_AGE. The counters are already updated as each
+    query is logged, so a refresh reads them rather than rescanning the logs.
+    Refreshes are single-flight: one thread per process and one process at a
+    time (via a Redis lock) recomputes while the others serve the previous
+    snapshot.
+    """
+    ns = get_namespace(tenant)
+    total, snapshot = _read_analytics_snapshot(ns)
+    if _snapshot_is_fresh(snapshot, total):
+        return _decode_snapshot(snapshot)
+
+    # With a snapshot to fall back on, don't wait for another thread's refresh
+    if not ns.analytics_refresh_lock.acquire(blocking=not snapshot):
+        return _decode_snapshot(snapshot)
+    try:
+        # Another thread may have refreshed it while we waited
+        total, snapshot = _read_analytics_snapshot(ns)
+        if _snapshot_is_fresh(snapshot, total):
+            return _decode_snapshot(snapshot)
+        lock_key = ns.key(ANALYTICS_SNAPSHOT_LOCK_KEY)
+        # A random token, so a refresh that outlives the lock can't release
+        # the one another process (on any host) took after it expired
+        lock_token = secrets.token_hex(16)
+        if not _redis().set(lock_key, lock_token, nx=True, px=ANALYTICS_REFRESH_LOCK_MS):
+            if snapshot:
+                return _decode_snapshot(snapshot)
+            # The first snapshot is being built elsewhere; answer from the counters directly
+            analytics = get_analytics(tenant=ns)
+            return {'version': analytics['total_queries'], 'computed_at': time.time(), 'analytics': analytics}
+        try:
+            analytics = get_analytics(tenant=ns)
+            snapshot = {
+                'version': analytics['total_queries'],
+                'computed_at': time.time(),
+                'data': json.dumps(analytics)
+            }
+            _redis().hset(ns.key(ANALYTICS_SNAPSHOT_KEY), mapping=snapshot)
+            return _decode_snapshot(snapshot)
+        finally:
+            _run_script('release_lock', keys=[lock_key], args=[lock_token])
+    finally:
+        ns.analytics_refresh_lock.release()
+
+def get_log_days(tenant=None):
+    """Return the YYYY-MM-DD days that still have a query log in Redis, oldest first."""
+    ns = get_namespace(tenant)
+    days = sorted(_redis().smembers(ns.key(LOG_DAYS_KEY)))
+    if not days:
+        return []
+    pipe = _redis().pipeline(transaction=False)
+    for day in days:
+        pipe.exists(log_key(day, ns))
+    present = pipe.execute()
+    # Forget days that expired or were archived
+    gone = [day for day, exists in zip(days, present) if not exists]
+    if gone:
+        _redis().srem(ns.key(LOG_DAYS_KEY), *gone)
+    return [day for day, exists in zip(days, present) if exists]
+
+def iter_log_batches(key, batch_size=1000, limit=None):
+    """
+    Yield lists of raw JSON entries from a log list, one LRANGE per batch.
+
+    Reads at most `limit` entries when given.
+    """
+    start = 0
+    while limit is None or start < limit:
+        end = start + batch_size if limit is None else min(start + batch_size, limit)
+        raw_logs = _redis().lrange(key, start, end - 1)
+        if raw_logs:
+            yield raw_logs
+        if len(raw_logs) < end - start:
+            return
+        start = end
+
+def trim_log(key, count):
+    """Drop the first `count` entries of a log list, keeping anything appended since."""
+    _redis().ltrim(key, count, -1)
 
-def add_term(term, definition):
-    """Add a new term."""
+def backfill_analytics(batch_size=1000, tenant=None):
+    """
+    Rebuild a namespace's analytics counters from the query logs still in
+    Redis (the per-day lists, and the legacy `logs` list for the default
+    namespace). Archived days are not replayed.
+
+    The counters are cleared in the same transaction that snapshots the list
+    lengths, so entries logged while the backfill runs are counted exactly once.
+    Returns the number of log entries replayed.
+    """
+    ns = get_namespace(tenant)
+    keys = [log_key(day, ns) for day in get_log_days(ns)]
+    if ns.team_id is None:
+        keys.insert(0, LEGACY_LOG_KEY)
+    pipe = _redis().pipeline(transaction=True)
+    for key in keys:
+        pipe.llen(key)
+    pipe.delete(*[ns.key(name) for name in (ANALYTICS_TERMS_KEY, ANALYTICS_DAILY_KEY, ANALYTICS_USERS_KEY,
+                                            ANALYTICS_TOTAL_KEY, ANALYTICS_FOUND_KEY, ANALYTICS_SEARCHES_KEY,
+                                            ANALYTICS_SNAPSHOT_KEY)])
+    lengths = pipe.execute()[:-1]
+
+    for key, length in zip(keys, lengths):
+        for raw_logs in iter_log_batches(key, batch_size, limit=length):
+            pipe = _redis().pipeline(transaction=False)
+            for raw_log in raw_logs:
+                _queue_analytics(pipe, json.loads(raw_log), ns)
+            pipe.execute()
+        if length:
+            logger.debug("Backfilled analytics for %d entries from %s", length, key)
+    return sum(lengths)
+
+@metrics.timed('add_term')
+def add_term(term, definition, tenant=None, aliases=None):
+    """
+    Add a new term in one atomic round trip. Returns False if it already exists.
+    Raises AliasConflictError if any of `aliases` belongs to another term.
+    """
     try:
-        term_key = f'term:{term.lower()}'
-        if redis_client.exists(term_key):
+        ns = get_namespace(tenant)
+        added = _run_script(
+            'add_term',
+            keys=_term_write_keys(term, ns),
+            args=[term, definition, datetime.utcnow().isoformat(), term.lower(),
+                  _search_payload(ns, term, definition), _alias_payload(term, aliases)]
+        )
+        if isinstance(added, list):
+            raise AliasConflictError(added)
+        if not added:
             return False
-        
-        term_data = {
-            'term': term,
-            'definition': definition,
-            'created_at': datetime.utcnow().isoformat()
-        }
-        redis_client.set(term_key, json.dumps(term_data))
-        redis_client.incr('terms:count')
+        _invalidate_local_caches(ns)
         return True
+    except AliasConflictError:
+        raise
     except Exception as e:
         logger.error(f"Error adding term: {str(e)}")
         return False
 
-def update_term(term, definition):
-    """Update an existing term."""
+@metrics.timed('update_term')
+def update_term(term, definition, tenant=None, aliases=None):
+    """
+    Update an existing term's definition in one atomic round trip, and its
+    aliases too unless `aliases` is None.
+    Raises AliasConflictError if any of `aliases` belongs to another term.
+    """
     try:
-        term_key = f'term:{term.lower()}'
-        if not redis_client.exists(term_key):
+        ns = get_namespace(tenant)
+        args = [definition, datetime.utcnow().isoformat(), term.lower(),
+                _search_payload(ns, term, definition)]
+        if aliases is not None:
+            args.append(_alias_payload(term, aliases))
+        updated = _run_script('update_term', keys=_term_write_keys(term, ns), args=args)
+        if isinstance(updated, list):
+            raise AliasConflictError(updated)
+        if not updated:
             return False
-        
-        term_data = json.loads(redis_client.get(term_key))
-        term_data['definition'] = definition
-        term_data['updated_at'] = datetime.utcnow().isoformat()
-        redis_client.set(term_key, json.dumps(term_data))
+        _invalidate_local_caches(ns)
         return True
+    except AliasConflictError:
+        raise
     except Exception as e:
         logger.error(f"Error updating term: {str(e)}")
         return False
 
-def delete_term(term):
-    """Delete a term."""
+@metrics.timed('delete_term')
+def delete_term(term, tenant=None):
+    """Delete a term in one atomic round trip."""
     try:
-        term_key = f'term:{term.lower()}'
-        if redis_client.exists(term_key):
-            redis_client.delete(term_key)
-            redis_client.decr('terms:count')
-            return True
-        return False
+        ns = get_namespace(tenant)
+        deleted = _run_script(
+            'delete_term',
+            keys=_term_write_keys(term, ns),
+            args=[term.lower(), _search_payload(ns), _alias_payload(term)]
+        )
+        if not deleted:
+            return False
+        _invalidate_local_caches(ns)
+        return True
     except Exception as e:
         logger.error(f"Error deleting term: {str(e)}")
         return False
 
-def get_all_terms():
-    """Get all terms."""
-    try:
-        terms = []
-        for key in redis_client.scan_iter("term:*"):
-            term_data = redis_client.get(key)
+@metrics.timed('set_aliases')
+def set_aliases(term, aliases, tenant=None):
+    """
+    Replace a term's aliases in one atomic round trip; an empty list removes
+    them. Returns the aliases stored, without duplicates or variants of the
+    name itself, or None if the term doesn't exist.
+    Raises AliasConflictError if any of them belongs to another term.
+    """
+    ns = get_namespace(tenant)
+    payload = _alias_payload(term, aliases)
+    result = _run_script('set_aliases', keys=_term_write_keys(term, ns), args=[term.lower(), payload])
+    if isinstance(result, list):
+        raise AliasConflictError(result)
+    if not result:
+        return None
+    _invalidate_local_caches(ns)
+    return json.loads(payload)['aliases']
+
+def _write_import_batch(batch, mode, report, ns):
+    """Write one batch of import rows with a single pipelined round trip."""
+    script = 'upsert_term' if mode == 'upsert' else 'add_term'
+    now = datetime.utcnow().isoformat()
+    pipe = _redis().pipeline(transaction=False)
+    for row in batch:
+        _run_script(
+            script,
+            keys=_term_write_keys(row['term'], ns),
+            args=[row['term'], row['definition'], now, row['term'].lower(),
+                  _search_payload(ns, row['term'], row['definition']), _alias_payload(row['term'])],
+            client=pipe
+        )
+    for row, result in zip(batch, pipe.execute(raise_on_error=False)):
+        if isinstance(result, Exception):
+            _record_import_error(report, row['line'], str(result))
+        elif result == 1:
+            report['added'] += 1
+        elif result == 2:
+            report['updated'] += 1
+        else:
+            report['skipped'] += 1
+
+def _record_import_error(report, line, error):
+    report['error_count'] += 1
+    if len(report['errors']) < MAX_IMPORT_ERRORS:
+        report['errors'].append({'line': line, 'error': error})
+
+@metrics.timed('import_terms')
+def import_terms(rows, mode='skip', batch_size=None, tenant=None):
+    """
+    Write parsed import rows in pipelined batches.
+
+    `rows` is an iterable of dicts with `line` and either `term` and
+    `definition` or an `error`. In 'skip' mode existing terms are left
+    alone; in 'upsert' mode their definitions are overwritten. Returns a
+    report with added/updated/skipped counts and per-row errors.
+    """
+    if mode not in ('skip', 'upsert'):
+        raise ValueError(f"Unknown import mode: {mode}")
+    ns = get_namespace(tenant)
+    batch_size = batch_size or IMPORT_BATCH_SIZE
+    report = {'added': 0, 'updated': 0, 'skipped': 0, 'error_count': 0, 'errors': []}
+    batch = []
+    for row in rows:
+        if 'error' in row:
+            _record_import_error(report, row['line'], row['error'])
+            continue
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _write_import_batch(batch, mode, report, ns)
+            batch = []
+    if batch:
+        _write_import_batch(batch, mode, report, ns)
+    _invalidate_local_caches(ns)
+    return report
+
+def _read_term_batch(keys):
+    """Read many terms with one pipelined round trip (plus one MGET for legacy keys)."""
+    pipe = _redis().pipeline(transaction=False)
+    for key in keys:
+        pipe.hgetall(key)
+    results = pipe.execute(raise_on_error=False)
+
+    legacy_keys = [key for key, result in zip(keys, results) if _is_wrong_type(result)]
+    for term_data in results:
+        if isinstance(term_data, dict) and term_data:
+            yield _decode_term(term_data)
+    if legacy_keys:
+        for term_data in _redis().mget(legacy_keys):
             if term_data:
-                terms.append(json.loads(term_data))
+                yield json.loads(term_data)
+
+def _scan_term_keys(ns, batch_size):
+    """Yield batches of a namespace's term keys found by SCAN (for maintenance jobs)."""
+    cursor = 0
+    while True:
+        cursor, keys = _redis().scan(cursor, match=ns.key('term:*'), count=batch_size)
+        for start in range(0, len(keys), batch_size):
+            yield keys[start:start + batch_size]
+        if cursor == 0:
+            break
+
+def _iter_scanned_terms(ns, batch_size):
+    """Yield every term dict found by SCAN, unordered and possibly repeated, a pipelined read per batch."""
+    for keys in _scan_term_keys(ns, batch_size):
+        yield from _read_term_batch(keys)
+
+def _scan_terms(ns, batch_size):
+    """Every term dict found by SCAN, in name order (held in memory to sort them)."""
+    terms = {term_data['term'].lower(): term_data for term_data in _iter_scanned_terms(ns, batch_size)}
+    return [terms[name] for name in sorted(terms)]
+
+def iter_terms(batch_size=None, tenant=None):
+    """
+    Yield every term dict in name order, paging through the namespace's
+    name index with one ZRANGEBYLEX and one pipelined read per batch.
+
+    Only the namespace's own index is read, so the cost doesn't grow with
+    the number of other workspaces sharing the Redis. A glossary upgraded
+    from a version without the index (until `flask rebuild-index` runs) is
+    read by SCAN instead, so bulk reads never silently come back empty.
+    """
+    ns = get_namespace(tenant)
+    batch_size = batch_size or TERM_BATCH_SIZE
+    low = '-'
+    while True:
+        members = _redis().zrangebylex(ns.key(TERMS_INDEX_KEY), low, '+', start=0, num=batch_size)
+        if not members:
+            if low == '-' and not _redis().exists(ns.key(TERMS_INDEX_KEY)):
+                yield from _scan_terms(ns, batch_size)
+            break
+        yield from _read_term_batch([ns.term_key(_split_index_member(member)[0]) for member in members])
+        if len(members) < batch_size:
+            break
+        low = f'({members[-1]}'
+
+@metrics.timed('get_all_terms')
+def get_all_terms(tenant=None):
+    """Get all terms, from the snapshot when it is current or Redis is unreachable."""
+    try:
+        ns = get_namespace(tenant)
+        try:
+            store = _snapshot_at(ns, _current_terms_version(ns))
+            terms = store.terms() if store is not None else list(iter_terms(tenant=ns))
+        except _UNAVAILABLE_ERRORS as e:
+            terms = _fallback_snapshot(ns, e).terms()
         return sorted(terms, key=lambda x: x['term'].lower())
     except Exception as e:
         logger.error(f"Error getting all terms: {str(e)}")
         return []
 
-# Initialize the database when this module is imported
-init_db() 
\ No newline at end of file
+def migrate_terms_to_hashes(batch_size=None, tenant=None):
+    """
+    Convert legacy JSON string terms to hashes.
+
+    Returns a report with the number of keys scanned and converted, and the
+    total MEMORY USAGE of the converted keys before and after (None if the
+    server doesn't support MEMORY USAGE).
+    """
+    ns = get_namespace(tenant)
+    batch_size = batch_size or TERM_BATCH_SIZE
+    report = {'scanned': 0, 'migrated': 0, 'bytes_before': 0, 'bytes_after': 0}
+    for keys in _scan_term_keys(ns, batch_size):
+        report['scanned'] += len(keys)
+
+        pipe = _redis().pipeline(transaction=False)
+        for key in keys:
+            pipe.type(key)
+        legacy_keys = [key for key, key_type in zip(keys, pipe.execute()) if key_type == 'string']
+
+        if legacy_keys:
+            pipe = _redis().pipeline(transaction=False)
+            for key in legacy_keys:
+                pipe.memory_usage(key)
+            for key in legacy_keys:
+                _run_script('migrate_term', keys=[key], args=[], client=pipe)
+            for key in legacy_keys:
+                pipe.memory_usage(key)
+            results = pipe.execute(raise_on_error=False)
+
+            count = len(legacy_keys)
+            before, converted, after = results[:count], results[count:2 * count], results[2 * count:]
+            report['migrated'] += sum(1 for result in converted if result == 1)
+            for name, sizes in (('bytes_before', before), ('bytes_after', after)):
+                if report[name] is not None and all(isinstance(size, int) for size in sizes):
+                    report[name] += sum(sizes)
+                else:
+                    report[name] = None
+
+    if report['migrated']:
+        _bump_terms_version(ns)
+    return report
+
+def rebuild_term_index(batch_size=None, tenant=None):
+    """
+    Rebuild the sorted-set name index from the stored terms, found by SCAN.
+
+    The index is built under a temporary key and swapped in with RENAME.
+    Terms added or deleted while it runs may be missed, so run it when the
+    glossary is quiet. Returns the number of indexed terms.
+    """
+    ns = get_namespace(tenant)
+    batch_size = batch_size or TERM_BATCH_SIZE
+    index_key = ns.key(TERMS_INDEX_KEY)
+    temp_key = f'{index_key}:rebuild'
+    _redis().delete(temp_key)
+    indexed = 0
+    for keys in _scan_term_keys(ns, batch_size):
+        batch = {f"{term_data['term'].lower()}\0{term_data['term']}": 0 for term_data in _read_term_batch(keys)}
+        if batch:
+            _redis().zadd(temp_key, batch)
+            indexed += len(batch)
+    if indexed:
+        _redis().rename(temp_key, index_key)
+    else:
+        _redis().delete(index_key)
+    return indexed
+
+def get_terms_version(tenant=None):
+    """Read terms:version straight from Redis, for building ETags."""
+    return _redis().get(get_namespace(tenant).key(TERMS_VERSION_KEY)) or '0'
+
+def _split_index_member(member):
+    name, _, display = member.partition('\0')
+    return name, display
+
+@metrics.timed('autocomplete')
+def autocomplete(prefix, limit=10, tenant=None):
+    """Return up to `limit` term names starting with `prefix`, in one ZRANGEBYLEX."""
+    prefix = prefix.lower()
+    if not prefix:
+        return []
+    try:
+        members = _redis().zrangebylex(get_namespace(tenant).key(TERMS_INDEX_KEY), f'[{prefix}', f'({prefix}{_LEX_MAX}', start=0, num=limit)
+        return [_split_index_member(member)[1] for member in members]
+    except Exception as e:
+        logger.error(f"Error autocompleting terms: {str(e)}")
+        return []
+
+@metrics.timed('list_terms')
+def list_terms(cursor=None, limit=50, query=None, match='prefix', tenant=None):
+    """
+    Page through terms in name order using the sorted-set index.
+
+    With match='prefix' (or no query) `cursor` is the lowercased name of the
+    last term on the previous page. With match='substring' the index is
+    walked with ZSCAN and `cursor` is its integer cursor, so results come
+    back unordered and a page may hold slightly more than `limit` terms.
+    A substring page stops after LIST_TERMS_MAX_SCANS calls, so it may be
+    short or empty while next_cursor still points further into the index.
+    Returns (terms, next_cursor); next_cursor is None on the last page.
+    """
+    ns = get_namespace(tenant)
+    index_key = ns.key(TERMS_INDEX_KEY)
+    query = (query or '').lower()
+    if match == 'substring' and query:
+        scan_cursor = int(cursor or 0)
+        pattern = '*' + ''.join(f'\\{c}' if c in '*?[]\\' else c for c in query) + '*\0*'
+        members = []
+        for _ in range(LIST_TERMS_MAX_SCANS):
+            scan_cursor, batch = _redis().zscan(index_key, scan_cursor, match=pattern, count=max(limit, 100))
+            members.extend(member for member, _ in batch)
+            if scan_cursor == 0 or len(members) >= limit:
+                break
+        next_cursor = str(scan_cursor) if scan_cursor else None
+    else:
+        low = query
+        if cursor and cursor >= low:
+            low = cursor + '\1'
+        high = f'({query}{_LEX_MAX}' if query else '+'
+        members = _redis().zrangebylex(index_key, f'[{low}' if low else '-', high, start=0, num=limit + 1)
+        next_cursor = None
+        if len(members) > limit:
+            members = members[:limit]
+            next_cursor = _split_index_member(members[-1])[0]
+
+    names = sorted(_split_index_member(member)[0] for member in members)
+    terms = {term_data['term'].lower(): term_data for term_data in _read_term_batch([ns.term_key(name) for name in names])}
+    return [terms[name] for name in names if name in terms], next_cursor
+
+def rebuild_search_index(batch_size=None, tenant=None):
+    """
+    Rebuild the full-text search index from the stored terms.
+
+    Existing search keys are deleted first, so searches return partial
+    results while this runs. Returns the number of indexed terms.
+    """
+    ns = get_namespace(tenant)
+    batch_size = batch_size or TERM_BATCH_SIZE
+    stats_key = ns.key(SEARCH_STATS_KEY)
+    for pattern in (ns.key(f'{SEARCH_POSTING_PREFIX}*'), ns.key(f'{SEARCH_DOC_PREFIX}*')):
+        batch = []
+        for key in _redis().scan_iter(pattern, count=batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                _redis().delete(*batch)
+                batch = []
+        if batch:
+            _redis().delete(*batch)
+    _redis().delete(stats_key)
+
+    indexed = 0
+    pipe = _redis().pipeline(transaction=False)
+    for term_data in iter_terms(batch_size, tenant=ns):
+        name = term_data['term'].lower()
+        _run_script(
+            'index_doc',
+            keys=[ns.key(f'{SEARCH_DOC_PREFIX}{name}'), stats_key],
+            args=[name, _search_payload(ns, term_data['term'], term_data.get('definition', ''))],
+            client=pipe
+        )
+        indexed += 1
+        if indexed % batch_size == 0:
+            pipe.execute()
+    pipe.execute()
+    # Make sure the stats key exists even for an empty glossary
+    _redis().hsetnx(stats_key, 'docs', 0)
+    return indexed
+
+def rebuild_alias_index(batch_size=None, tenant=None):
+    """
+    Rebuild the alias index from the stored terms' names and aliases.
+
+    The index is built under a temporary key and swapped in with RENAME, so
+    lookups keep working while it runs. Explicit aliases win over names;
+    between names, the first in name order wins. Returns the number of
+    index entries.
+    """
+    ns = get_namespace(tenant)
+    batch_size = batch_size or TERM_BATCH_SIZE
+    aliases_key = ns.key(ALIASES_KEY)
+    temp_key = f'{aliases_key}:rebuild'
+    _redis().delete(temp_key)
+    pipe = _redis().pipeline(transaction=False)
+    for count, term_data in enumerate(iter_terms(batch_size, tenant=ns), start=1):
+        name = term_data['term'].lower()
+        alias = json.loads(_alias_payload(term_data['term'], term_data.get('aliases', [])))
+        for key in alias['keys']:
+            pipe.hset(temp_key, key, name)
+        if alias['name_key']:
+            pipe.hsetnx(temp_key, alias['name_key'], name)
+        if count % batch_size == 0:
+            pipe.execute()
+    pipe.execute()
+    entries = _redis().hlen(temp_key)
+    if entries:
+        _redis().rename(temp_key, aliases_key)
+    else:
+        _redis().delete(aliases_key)
+    _bump_terms_version(ns)
+    return entries
+
+@metrics.timed('search_terms')
+def search_terms(query, limit=10, tenant=None):
+    """
+    Full-text search over term names and definitions, ranked with BM25.
+
+    Reads the posting list of each query token plus the index statistics in
+    one round trip, then fetches the top terms in a second. Returns a list
+    of term dicts with an added `score`, best first.
+    """
+    tokens = sorted(set(search.tokenize(query)))
+    if not tokens:
+        return []
+    try:
+        ns = get_namespace(tenant)
+        pipe = _redis().pipeline(transaction=False)
+        pipe.hmget(ns.key(SEARCH_STATS_KEY), 'docs', 'length')
+        for token in tokens:
+            pipe.hgetall(ns.key(f'{SEARCH_POSTING_PREFIX}{token}'))
+        (doc_count, total_length), *posting_lists = pipe.execute()
+
+        postings = {}
+        for token, posting in zip(tokens, posting_lists):
+            docs = {}
+            for name, value in posting.items():
+                tf, _, length = value.partition(':')
+                docs[name] = (int(tf), int(length))
+            postings[token] = docs
+
+        ranked = search.rank(postings, int(doc_count or 0), int(total_length or 0), limit=limit)
+        if not ranked:
+            return []
+        terms = {term_data['term'].lower(): term_data
+                 for term_data in _read_term_batch([ns.term_key(name) for name, _ in ranked])}
+        return [dict(terms[name], score=round(score, 4)) for name, score in ranked if name in terms]
+    except Exception as e:
+        logger.error(f"Error searching terms: {str(e)}")
+        return []
@@ -0,0 +1,159 @@
+"""
+Asyncio versions of the hot-path reads in database.py, for asgi.py.
+
+These use database.py's key layout, Lua scripts, namespaces, worker-local
+term caches and glossary snapshots, so the sync and async entry points
+share one storage layer; only the client differs (redis.asyncio, with its
+own pool).
+Writes, admin reads and maintenance stay synchronous; from the event loop
+they run in a thread via run_sync.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import redis.asyncio
+
+import database as db
+import metrics
+from cache import MISSING
+
+logger = logging.getLogger(__name__)
+
+# One process multiplexes many requests over this pool, so it is larger
+# than the per-thread sync pool
+ASYNC_REDIS_MAX_CONNECTIONS = int(os.getenv('ASYNC_REDIS_MAX_CONNECTIONS', '50'))
+# Threads for fuzzy suggestion scoring, kept off the event loop
+FUZZY_WORKERS = int(os.getenv('FUZZY_WORKERS', '4'))
+
+redis_client = None
+_registered_scripts = {}
+_fuzzy_executor = None
+_fuzzy_executor_lock = threading.Lock()
+
+
+def get_redis_client():
+    """Return the shared asyncio client, creating it on first use inside the event loop."""
+    global redis_client
+    if redis_client is None:
+        redis_client = redis.asyncio.Redis(connection_pool=db.create_connection_pool(
+            pool_class=redis.asyncio.ConnectionPool, max_connections=ASYNC_REDIS_MAX_CONNECTIONS))
+    return redis_client
+
+
+async def close():
+    """Close the asyncio client's connections, e.g. at ASGI shutdown."""
+    global redis_client
+    if redis_client is not None:
+        await redis_client.close()
+        await redis_client.connection_pool.disconnect()
+        redis_client = None
+        _registered_scripts.clear()
+
+
+async def run_sync(func, *args, **kwargs):
+    """Run a blocking function in the loop's default thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+async def _run_script(name, keys, args):
+    """Run one of database._SCRIPTS on the asyncio client."""
+    script = _registered_scripts.get(name)
+    if script is None:
+        script = _registered_scripts[name] = get_redis_client().register_script(db._SCRIPTS[name])
+    return await script(keys=keys, args=args)
+
+
+async def get_namespace(tenant=None):
+    """database.get_namespace, initializing a new workspace's namespace in a thread."""
+    if not db.MULTI_TENANT or not tenant or tenant == db.DEFAULT_TEAM_ID:
+        return db.get_namespace(None)
+    ns = db._namespaces.get(tenant)
+    if ns is not None and ns.initialized:
+        return db.get_namespace(tenant)
+    return await run_sync(db.get_namespace, tenant)
+
+
+async def _current_terms_version(ns):
+    """Async database._current_terms_version, sharing its per-namespace state."""
+    now = time.monotonic()
+    if db._terms_version_is_due(ns, now):
+        db._record_terms_version(ns, await get_redis_client().get(ns.key(db.TERMS_VERSION_KEY)), now)
+    return ns.terms_version['value']
+
+
+async def get_cached_response(text, tenant=None):
+    """Async database.get_cached_response."""
+    try:
+        ns = await get_namespace(tenant)
+        version = await _current_terms_version(ns)
+        return version, db.cached_response(ns, text, version)
+    except Exception as e:
+        logger.error(f"Error reading the response cache: {str(e)}")
+        return db._UNSET, None
+
+
+@metrics.timed('get_term')
+async def get_term(term, tenant=None):
+    """Async database.get_term: name or alias, via the same worker-local cache and snapshot."""
+    try:
+        ns = await get_namespace(tenant)
+        key = term.lower()
+        try:
+            version = await _current_terms_version(ns)
+            term_data = db.cached_term(ns, key, version)
+            if term_data is not MISSING:
+                return term_data
+            store = db._snapshot_at(ns, version)
+            if store is not None:
+                term_data = store.get_term(key)
+            else:
+                term_data = db._decode_resolved(await _run_script('resolve_term', **db._resolve_arguments(key, ns)))
+        except db._UNAVAILABLE_ERRORS as e:
+            return db._fallback_snapshot(ns, e).get_term(key)
+        db.cache_term(ns, key, version, term_data)
+        return term_data
+    except Exception as e:
+        logger.error(f"Error getting term: {str(e)}")
+        return None
+
+
+@metrics.timed('autocomplete')
+async def autocomplete(prefix, limit=10, tenant=None):
+    """Async database.autocomplete."""
+    prefix = prefix.lower()
+    if not prefix:
+        return []
+    try:
+        ns = await get_namespace(tenant)
+        members = await get_redis_client().zrangebylex(
+            ns.key(db.TERMS_INDEX_KEY), f'[{prefix}', f'({prefix}{db._LEX_MAX}', start=0, num=limit)
+        return [db._split_index_member(member)[1] for member in members]
+    except Exception as e:
+        logger.error(f"Error autocompleting terms: {str(e)}")
+        return []
+
+
+def _get_fuzzy_executor():
+    global _fuzzy_executor
+    if _fuzzy_executor is None:
+        with _fuzzy_executor_lock:
+            if _fuzzy_executor is None:
+                _fuzzy_executor = ThreadPoolExecutor(max_workers=FUZZY_WORKERS, thread_name_prefix='fuzzy')
+    return _fuzzy_executor
+
+
+async def find_similar_terms(term, threshold=80, limit=None, tenant=None):
+    """
+    database.find_similar_terms on a dedicated thread pool, so scoring (and
+    rebuilding the suggestion index after an edit) never blocks the loop.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _get_fuzzy_executor(),
+        functools.partial(db.find_similar_terms, term, threshold=threshold, limit=limit, tenant=tenant)
+    )
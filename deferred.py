@@ -0,0 +1,120 @@
+"""
+Deferred Slack responses.
+
+Slash commands must be acknowledged within 3 seconds. Work that may be
+slow (fuzzy suggestions, full-text search) is handed to a bounded thread
+pool; the request returns an empty acknowledgement right away and the
+result is posted to the command's response_url when it is ready.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import slack_utils
+
+logger = logging.getLogger(__name__)
+
+# Serverless platforms (Vercel, AWS Lambda) freeze the function once the
+# response is returned, so a deferred post might never be sent there
+SERVERLESS = bool(os.getenv('VERCEL') or os.getenv('AWS_LAMBDA_FUNCTION_NAME'))
+# SLACK_DEFERRED_RESPONSES=false answers every command inline; that is the
+# default on serverless platforms
+DEFERRED_RESPONSES = os.getenv('SLACK_DEFERRED_RESPONSES', 'false' if SERVERLESS else 'true').lower() == 'true'
+DEFERRED_WORKERS = int(os.getenv('DEFERRED_WORKERS', '4'))
+# Jobs queued or running beyond this are refused and answered inline instead
+DEFERRED_MAX_PENDING = int(os.getenv('DEFERRED_MAX_PENDING', '64'))
+# Number of recent end-to-end latencies kept for percentiles
+LATENCY_WINDOW = 1000
+
+
+class DeferredResponder:
+    """Bounded worker pool that builds Slack payloads and posts them to response_url."""
+
+    def __init__(self, workers=DEFERRED_WORKERS, max_pending=DEFERRED_MAX_PENDING):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='slack-deferred')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self.pending = 0
+        self.stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0}
+
+    def submit(self, response_url, received_at, build_payload, *args):
+        """
+        Run build_payload(*args) on the pool and post its result to response_url.
+
+        `received_at` is the time.monotonic() value when the command arrived,
+        for end-to-end latency. Returns False when the pool is full, in
+        which case the caller should answer inline.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats['rejected'] += 1
+            return False
+        with self._lock:
+            self.pending += 1
+            self.stats['submitted'] += 1
+        self._executor.submit(self._run, response_url, received_at, build_payload, args)
+        return True
+
+    def _run(self, response_url, received_at, build_payload, args):
+        ok = False
+        try:
+            ok = slack_utils.post_to_response_url(response_url, build_payload(*args))
+        except Exception as e:
+            logger.error(f"Deferred Slack response failed: {type(e).__name__}: {str(e)}")
+        finally:
+            latency = time.monotonic() - received_at
+            with self._lock:
+                self.pending -= 1
+                self.stats['completed' if ok else 'failed'] += 1
+                self._latencies.append(latency)
+            self._slots.release()
+
+    def get_stats(self):
+        """Return queue depth, outcome counters and end-to-end latency percentiles (ms)."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = dict(self.stats, queue_depth=self.pending)
+        if latencies:
+            stats['latency_ms'] = {
+                'p50': latencies[len(latencies) // 2] * 1000,
+                'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+                'max': latencies[-1] * 1000
+            }
+        return stats
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+_responder = None
+_responder_pid = None
+_responder_lock = threading.Lock()
+
+
+def get_responder():
+    """Return this process's responder, creating a fresh one after a fork."""
+    global _responder, _responder_pid
+    if _responder is None or _responder_pid != os.getpid():
+        with _responder_lock:
+            if _responder is None or _responder_pid != os.getpid():
+                _responder = DeferredResponder()
+                _responder_pid = os.getpid()
+    return _responder
+
+
+def defer(response_url, received_at, build_payload, *args):
+    """Defer a response if deferral is enabled and possible; returns True if it was."""
+    if not DEFERRED_RESPONSES or not response_url:
+        return False
+    return get_responder().submit(response_url, received_at, build_payload, *args)
+
+
+def get_stats():
+    if _responder is None or _responder_pid != os.getpid():
+        return {'enabled': DEFERRED_RESPONSES, 'queue_depth': 0}
+    return dict(_responder.get_stats(), enabled=DEFERRED_RESPONSES)
@@ -0,0 +1,105 @@
+"""
+Local read-only snapshots of a glossary, one SQLite file per namespace.
+
+A snapshot holds every term dict and the alias index as they stood at one
+value of terms:version. database.py builds it from Redis, serves lookups
+from it without a round trip while that version is current, and falls back
+to it, however old, while Redis is unreachable. Files are written under a
+temporary name and renamed into place, never modified, so any number of
+workers can share one and a reader never sees a half-written glossary.
+"""
+
+import json
+import logging
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+
+import search
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE meta (version TEXT, built_at REAL NOT NULL, terms INTEGER NOT NULL);
+CREATE TABLE terms (name TEXT PRIMARY KEY, data TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE aliases (key TEXT PRIMARY KEY, name TEXT NOT NULL) WITHOUT ROWID;
+"""
+
+
+class Snapshot:
+    """An open, read-only snapshot file."""
+
+    def __init__(self, path):
+        self.path = path
+        # immutable=1 skips file locking: a snapshot is replaced, never changed
+        uri = pathlib.Path(path).absolute().as_uri() + '?mode=ro&immutable=1'
+        self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.version, self.built_at, self.terms_count = self._conn.execute(
+            'SELECT version, built_at, terms FROM meta').fetchone()
+
+    def __repr__(self):
+        return f'Snapshot({self.path!r}, version={self.version!r})'
+
+    def get_term(self, name):
+        """
+        Return the term dict for a lowercased name, falling back to the alias
+        index like the resolve_term script; None if neither matches.
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM terms WHERE name = ?', (name,)).fetchone()
+            if row is None:
+                key = search.normalize(name)
+                if key:
+                    row = self._conn.execute(
+                        'SELECT terms.data FROM aliases JOIN terms ON terms.name = aliases.name '
+                        'WHERE aliases.key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def terms(self):
+        """Return every term dict in name order."""
+        with self._lock:
+            rows = self._conn.execute('SELECT data FROM terms ORDER BY name').fetchall()
+        return [json.loads(data) for data, in rows]
+
+
+def open_snapshot(path):
+    """Open the snapshot at `path`; None if there isn't a readable one."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return Snapshot(path)
+    except (sqlite3.Error, TypeError) as e:
+        logger.warning(f"Ignoring unreadable glossary snapshot {path}: {type(e).__name__}: {str(e)}")
+        return None
+
+
+def write(path, version, terms, aliases):
+    """
+    Write a snapshot of `terms` (term dicts, in any order; a repeated name
+    keeps the last) and `aliases` ((normalized key, lowercased name) pairs)
+    taken at `version`, replace the file at `path` with it, and return it
+    opened.
+    """
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    rows = ((term_data['term'].lower(), json.dumps(term_data)) for term_data in terms)
+    try:
+        conn = sqlite3.connect(temp_path)
+        try:
+            conn.executescript(_SCHEMA)
+            # SCAN can return a key twice
+            conn.executemany('INSERT OR REPLACE INTO terms VALUES (?, ?)', rows)
+            conn.executemany('INSERT OR REPLACE INTO aliases VALUES (?, ?)', aliases)
+            count = conn.execute('SELECT COUNT(*) FROM terms').fetchone()[0]
+            conn.execute('INSERT INTO meta VALUES (?, ?, ?)', (version, time.time(), count))
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return Snapshot(path)
@@ -0,0 +1,152 @@
+"""
+Archival of old query logs, and analytics over any date range.
+
+Days older than LOG_ARCHIVE_AFTER_DAYS are moved out of Redis into one
+gzipped NDJSON file per day under LOG_ARCHIVE_DIR (in a subdirectory per
+workspace outside the default namespace). Range analytics stream
+those files back line by line, together with the days still in Redis, so
+neither side ever holds a whole range in memory.
+"""
+
+import gzip
+import json
+import os
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import database as db
+import metrics
+
+LOG_ARCHIVE_DIR = os.getenv('LOG_ARCHIVE_DIR', 'log_archive')
+# Days older than this are archived by `flask archive-logs`; keep it below
+# LOG_RETENTION_DAYS so days are archived before Redis expires them
+LOG_ARCHIVE_AFTER_DAYS = int(os.getenv('LOG_ARCHIVE_AFTER_DAYS', '7'))
+# Longest date range /admin/analytics will scan
+MAX_RANGE_DAYS = int(os.getenv('ANALYTICS_MAX_RANGE_DAYS', '366'))
+
+
+def _tenant_dir(archive_dir, tenant):
+    team_id = db.get_namespace(tenant).team_id
+    archive_dir = archive_dir or LOG_ARCHIVE_DIR
+    return os.path.join(archive_dir, team_id) if team_id else archive_dir
+
+
+def archive_path(day, archive_dir=None, tenant=None):
+    return os.path.join(_tenant_dir(archive_dir, tenant), f'logs-{day}.ndjson.gz')
+
+
+def _archive_key(key, files, archive_dir, batch_size, ns):
+    """Append every entry of a log list to its day's archive; returns the number copied."""
+    copied = 0
+    for raw_logs in db.iter_log_batches(key, batch_size):
+        for raw_log in raw_logs:
+            day = db.log_day(json.loads(raw_log))
+            if day not in files:
+                files[day] = gzip.open(archive_path(day, archive_dir, ns), 'at', encoding='utf-8')
+            files[day].write(raw_log + '\n')
+        copied += len(raw_logs)
+    return copied
+
+
+def archive_logs(older_than_days=None, archive_dir=None, batch_size=1000, tenant=None):
+    """
+    Move a namespace's days older than `older_than_days` from Redis to
+    gzipped NDJSON files. For the default namespace, also drain the legacy
+    `logs` list into per-day files.
+
+    Each run appends a new gzip member to a day's file, so a day can be
+    archived more than once. Entries are trimmed from Redis only after the
+    files are closed; if the job dies in between, the next run copies them
+    again, so a crash can duplicate entries but never lose them.
+    Returns {'days': days archived, 'entries': entries moved}.
+    """
+    if older_than_days is None:
+        older_than_days = LOG_ARCHIVE_AFTER_DAYS
+    ns = db.get_namespace(tenant)
+    os.makedirs(_tenant_dir(archive_dir, ns), exist_ok=True)
+    cutoff = (datetime.utcnow().date() - timedelta(days=older_than_days)).isoformat()
+    keys = [db.log_key(day, ns) for day in db.get_log_days(ns) if day < cutoff]
+    if ns.team_id is None:
+        keys.insert(0, db.LEGACY_LOG_KEY)
+
+    files = {}
+    copied = {}
+    try:
+        for key in keys:
+            copied[key] = _archive_key(key, files, archive_dir, batch_size, ns)
+    finally:
+        for f in files.values():
+            f.close()
+    for key, count in copied.items():
+        if count:
+            db.trim_log(key, count)
+    return {'days': len(files), 'entries': sum(copied.values())}
+
+
+def iter_range_entries(start, end, archive_dir=None, batch_size=1000, tenant=None):
+    """Yield every logged query from `start` to `end` (dates, inclusive), archives first."""
+    ns = db.get_namespace(tenant)
+    redis_days = set(db.get_log_days(ns))
+    day = start
+    while day <= end:
+        day_name = day.isoformat()
+        path = archive_path(day_name, archive_dir, ns)
+        if os.path.exists(path):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        if day_name in redis_days:
+            for raw_logs in db.iter_log_batches(db.log_key(day_name, ns), batch_size):
+                for raw_log in raw_logs:
+                    yield json.loads(raw_log)
+        day += timedelta(days=1)
+
+
+@metrics.timed('get_range_analytics')
+def get_range_analytics(start, end, top_n=10, archive_dir=None, tenant=None):
+    """
+    Compute analytics for `start` to `end` (dates, inclusive) from the raw
+    logs, in the same shape as database.get_analytics. Unique users is exact.
+    """
+    if end < start:
+        raise ValueError("start must not be after end")
+    if (end - start).days + 1 > MAX_RANGE_DAYS:
+        raise ValueError(f"Date ranges are limited to {MAX_RANGE_DAYS} days")
+
+    terms = Counter()
+    daily = Counter()
+    users = set()
+    total = found = searches = 0
+    for log_data in iter_range_entries(start, end, archive_dir, tenant=tenant):
+        if log_data.get('kind') == db.SEARCH_LOG_KIND:
+            searches += 1
+            continue
+        terms[log_data.get('term', '')] += 1
+        daily[db.log_day(log_data)] += 1
+        users.add(log_data.get('user_id', ''))
+        total += 1
+        found += bool(log_data.get('found', False))
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "top_terms": [{'term': term, 'count': count} for term, count in terms.most_common(top_n)],
+        "daily_queries": [{'date': day, 'count': count} for day, count in sorted(daily.items(), reverse=True)],
+        "total_queries": total,
+        "unique_users": len(users),
+        "success_rate": (found / total * 100) if total > 0 else 0,
+        "search_queries": searches
+    }
+
+
+def parse_range(start, end, default_days=7):
+    """
+    Parse optional YYYY-MM-DD query parameters into a (start, end) date pair.
+
+    A missing end means today (UTC); a missing start means `default_days`
+    days ending at `end`. Raises ValueError for malformed dates.
+    """
+    end_date = date.fromisoformat(end) if end else datetime.utcnow().date()
+    start_date = date.fromisoformat(start) if start else end_date - timedelta(days=default_days - 1)
+    return start_date, end_date
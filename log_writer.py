@@ -0,0 +1,167 @@
+"""
+Background query logging.
+
+Slash command handlers hand log entries to a bounded in-process queue and
+return immediately. A daemon thread drains the queue and writes entries in
+batches through database.log_queries, so a slow Redis never delays a Slack
+response.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+import database as db
+import deferred
+
+logger = logging.getLogger(__name__)
+
+# Set ASYNC_QUERY_LOG=false to log synchronously. That is the default on
+# serverless platforms (see deferred.SERVERLESS), which freeze or recycle
+# the process between requests and would lose whatever is still queued.
+ASYNC_QUERY_LOG = os.getenv('ASYNC_QUERY_LOG', 'false' if deferred.SERVERLESS else 'true').lower() == 'true'
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+LOG_FLUSH_SIZE = int(os.getenv('LOG_FLUSH_SIZE', '100'))
+LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', '1.0'))  # seconds
+# What to do when the queue is full: 'drop' the entry and count it, or
+# 'block' the caller for up to LOG_QUEUE_BLOCK_TIMEOUT seconds and then drop
+LOG_QUEUE_OVERFLOW = os.getenv('LOG_QUEUE_OVERFLOW', 'drop').lower()
+LOG_QUEUE_BLOCK_TIMEOUT = float(os.getenv('LOG_QUEUE_BLOCK_TIMEOUT', '0.05'))
+
+
+class QueryLogWriter:
+    """Bounded queue of log entries drained in batches by a worker thread."""
+
+    def __init__(self, maxsize=LOG_QUEUE_SIZE, flush_size=LOG_FLUSH_SIZE,
+                 flush_interval=LOG_FLUSH_INTERVAL, overflow=LOG_QUEUE_OVERFLOW):
+        if overflow not in ('drop', 'block'):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.stats = {'queued': 0, 'written': 0, 'dropped': 0, 'failed': 0}
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stop.clear()
+                    self._thread = threading.Thread(
+                        target=self._run, name='query-log-writer', daemon=True
+                    )
+                    self._thread.start()
+
+    def submit(self, entry):
+        """Queue a log entry. Returns False if it was dropped."""
+        self._ensure_started()
+        try:
+            if self.overflow == 'block':
+                self._queue.put(entry, timeout=LOG_QUEUE_BLOCK_TIMEOUT)
+            else:
+                self._queue.put_nowait(entry)
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return False
+        self.stats['queued'] += 1
+        return True
+
+    def _take_batch(self):
+        """Block for the first entry, then gather more until the batch is full or the interval ends."""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.flush_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self):
+        """Take whatever is queued right now without waiting."""
+        batch = []
+        while len(batch) < self.flush_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        if db.log_queries(batch):
+            self.stats['written'] += len(batch)
+        else:
+            self.stats['failed'] += len(batch)
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._take_batch()
+            if batch:
+                self._write(batch)
+        # Graceful shutdown: flush everything still queued
+        batch = self._drain()
+        while batch:
+            self._write(batch)
+            batch = self._drain()
+
+    def close(self, timeout=5.0):
+        """Stop the worker after flushing queued entries."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.error(f"Query log writer did not flush within {timeout}s, "
+                             f"{self._queue.qsize()} entries lost")
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Return this process's writer, creating a fresh one after a fork."""
+    global _writer, _writer_pid
+    if _writer is None or _writer_pid != os.getpid():
+        with _writer_lock:
+            if _writer is None or _writer_pid != os.getpid():
+                _writer = QueryLogWriter()
+                _writer_pid = os.getpid()
+    return _writer
+
+
+def get_stats():
+    """Return this process's writer counters and queue depth without starting a writer."""
+    if _writer is None or _writer_pid != os.getpid():
+        return {'enabled': ASYNC_QUERY_LOG, 'queue_depth': 0}
+    return dict(_writer.stats, enabled=ASYNC_QUERY_LOG, queue_depth=_writer.queue_depth())
+
+
+def log_query(user_id, term, found, team_id=None, kind=None):
+    """Log a query without waiting on Redis, unless ASYNC_QUERY_LOG is off."""
+    entry = db.make_log_entry(user_id, term, found, team_id, kind)
+    if not ASYNC_QUERY_LOG:
+        return db.log_queries([entry])
+    return get_writer().submit(entry)
+
+
+@atexit.register
+def shutdown():
+    """Flush pending entries when the worker process exits."""
+    if _writer is not None and _writer_pid == os.getpid():
+        _writer.close()
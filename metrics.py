@@ -0,0 +1,204 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters and histograms are plain Python objects guarded by a lock, cheap
+enough to leave on permanently. Other modules register collector
+functions for values they already track (cache stats, queue depths),
+which are read only when /metrics is scraped.
+"""
+
+import bisect
+import contextvars
+import functools
+import inspect
+import threading
+import time
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_metrics = []
+_collectors = []
+# Database function currently running; a context variable rather than a
+# thread-local so concurrent coroutines on one event loop don't mix it up
+_current_function = contextvars.ContextVar('current_function', default=None)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class Counter:
+    """A monotonically increasing value per label set."""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for label_values, value in items:
+            yield self.name, _format_labels(self.labels, label_values), value
+
+
+class Histogram:
+    """Observations bucketed by upper bound, per label set."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, (list(counts), total, count)) for labels, (counts, total, count) in self._values.items()]
+        for label_values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield (f'{self.name}_bucket',
+                       _format_labels(self.labels + ('le',), label_values + (le,)),
+                       cumulative)
+            yield f'{self.name}_sum', _format_labels(self.labels, label_values), total
+            yield f'{self.name}_count', _format_labels(self.labels, label_values), count
+
+
+def register_collector(collect):
+    """
+    Register a function called at scrape time.
+
+    It returns a list of (name, kind, documentation, value) tuples, where
+    value is a number or a list of (labels dict, number) pairs.
+    """
+    _collectors.append(collect)
+
+
+def render():
+    """Render every metric in the Prometheus text format."""
+    lines = []
+    for metric in _metrics:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for name, labels, value in metric.samples():
+            lines.append(f'{name}{labels} {value}')
+    for collect in _collectors:
+        try:
+            collected = collect()
+        except Exception as e:
+            lines.append(f'# collector {getattr(collect, "__name__", collect)} failed: {type(e).__name__}')
+            continue
+        for name, kind, documentation, value in collected:
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} {kind}')
+            if isinstance(value, list):
+                for labels, sample in value:
+                    lines.append(f'{name}{_format_labels(tuple(labels), tuple(labels.values()))} {sample}')
+            else:
+                lines.append(f'{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+http_request_seconds = Histogram(
+    'whatis_http_request_seconds', 'HTTP request latency by route.', labels=('route', 'method'))
+http_requests = Counter(
+    'whatis_http_requests_total', 'HTTP requests by route and status.', labels=('route', 'status'))
+db_call_seconds = Histogram(
+    'whatis_db_call_seconds', 'Latency of database module functions.', labels=('function',))
+db_call_errors = Counter(
+    'whatis_db_call_errors_total', 'Exceptions raised by database module functions.', labels=('function',))
+redis_round_trips = Counter(
+    'whatis_redis_round_trips_total', 'Redis round trips (single commands or pipelines) by calling database function.',
+    labels=('function',))
+lookups = Counter(
+    'whatis_lookups_total', 'Slash command lookups by result.', labels=('result',))
+snapshot_reads = Counter(
+    'whatis_snapshot_reads_total',
+    'Glossary reads served from the local snapshot: current, or fallback while Redis is unreachable.',
+    labels=('reason',))
+
+
+def timed(function_name):
+    """
+    Decorator recording a database function's latency and attributing the
+    Redis round trips made inside it to `function_name`. Works on plain and
+    async functions.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                token = _current_function.set(function_name)
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    db_call_errors.inc(function_name)
+                    raise
+                finally:
+                    db_call_seconds.observe(time.perf_counter() - start, function_name)
+                    _current_function.reset(token)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            token = _current_function.set(function_name)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                db_call_errors.inc(function_name)
+                raise
+            finally:
+                db_call_seconds.observe(time.perf_counter() - start, function_name)
+                _current_function.reset(token)
+        return wrapper
+    return decorator
+
+
+def instrument_connection_class(connection_class):
+    """
+    Return a subclass of a redis-py connection class (sync or asyncio) that
+    counts round trips.
+    """
+    class InstrumentedConnection(connection_class):
+        def send_packed_command(self, command, check_health=True):
+            redis_round_trips.inc(_current_function.get() or 'other')
+            # For asyncio connections this returns the coroutine for the caller to await
+            return super().send_packed_command(command, check_health)
+
+    InstrumentedConnection.__name__ = f'Instrumented{connection_class.__name__}'
+    return InstrumentedConnection
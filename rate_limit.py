@@ -0,0 +1,193 @@
+"""
+Per-user and per-workspace rate limiting for slash commands.
+
+Each user and each workspace (Slack team) has a token bucket in Redis.
+Both are checked and charged in one atomic Lua call. After a rejection,
+the caller is also refused locally until its retry time without touching
+Redis, so a runaway script costs this worker almost nothing.
+"""
+
+import logging
+import os
+import threading
+import time
+
+import database as db
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+USER_PER_MINUTE = float(os.getenv('RATE_LIMIT_USER_PER_MINUTE', '30'))
+USER_BURST = float(os.getenv('RATE_LIMIT_USER_BURST', '10'))
+TEAM_PER_MINUTE = float(os.getenv('RATE_LIMIT_TEAM_PER_MINUTE', '600'))
+TEAM_BURST = float(os.getenv('RATE_LIMIT_TEAM_BURST', '100'))
+# Upper bound on remembered local rejections
+LOCAL_CACHE_SIZE = 10000
+
+# KEYS: user bucket, team bucket
+# ARGV: now (seconds), user rate (tokens/s), user burst, team rate, team burst
+# Returns {allowed (0/1), retry_after_ms, team_exhausted (0/1)}
+_TOKEN_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local function refill(key, rate, burst)
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    return math.min(burst, tokens + math.max(0, now - ts) * rate)
+end
+local function save(key, tokens, rate, burst)
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', ARGV[1])
+    redis.call('PEXPIRE', key, math.ceil(burst / rate * 1000) + 1000)
+end
+
+local user_rate, user_burst = tonumber(ARGV[2]), tonumber(ARGV[3])
+local team_rate, team_burst = tonumber(ARGV[4]), tonumber(ARGV[5])
+local user_tokens = refill(KEYS[1], user_rate, user_burst)
+local team_tokens = refill(KEYS[2], team_rate, team_burst)
+
+if user_tokens >= 1 and team_tokens >= 1 then
+    save(KEYS[1], user_tokens - 1, user_rate, user_burst)
+    save(KEYS[2], team_tokens - 1, team_rate, team_burst)
+    return {1, 0, 0}
+end
+
+local wait = 0
+local team_exhausted = 0
+if user_tokens < 1 then
+    wait = (1 - user_tokens) / user_rate
+end
+if team_tokens < 1 then
+    wait = math.max(wait, (1 - team_tokens) / team_rate)
+    team_exhausted = 1
+end
+return {0, math.ceil(wait * 1000), team_exhausted}
+"""
+
+
+class RateLimiter:
+    """Token buckets per user and per workspace, with a local fast-reject cache."""
+
+    def __init__(self, user_per_minute=USER_PER_MINUTE, user_burst=USER_BURST,
+                 team_per_minute=TEAM_PER_MINUTE, team_burst=TEAM_BURST):
+        self.user_rate = user_per_minute / 60.0
+        self.user_burst = user_burst
+        self.team_rate = team_per_minute / 60.0
+        self.team_burst = team_burst
+        self._script = None
+        self._async_script = None
+        self._blocked_until = {}
+        self._lock = threading.Lock()
+        self.stats = {'allowed': 0, 'rejected': 0, 'rejected_local': 0, 'errors': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _locally_blocked(self, keys, now):
+        with self._lock:
+            for key in keys:
+                until = self._blocked_until.get(key)
+                if until is not None:
+                    if until > now:
+                        return until - now
+                    del self._blocked_until[key]
+        return None
+
+    def _block_locally(self, key, until):
+        with self._lock:
+            if len(self._blocked_until) >= LOCAL_CACHE_SIZE:
+                now = time.monotonic()
+                self._blocked_until = {k: v for k, v in self._blocked_until.items() if v > now}
+                if len(self._blocked_until) >= LOCAL_CACHE_SIZE:
+                    self._blocked_until.clear()
+            self._blocked_until[key] = until
+
+    def _keys(self, team_id, user_id):
+        team_id = team_id or 'default'
+        return f'ratelimit:{{{team_id}}}:user:{user_id}', f'ratelimit:{{{team_id}}}:team'
+
+    def _args(self):
+        return [f'{time.time():.3f}', self.user_rate, self.user_burst, self.team_rate, self.team_burst]
+
+    def check(self, team_id, user_id):
+        """
+        Charge one request to the user's and workspace's buckets.
+
+        Returns (allowed, retry_after_seconds). Fails open when Redis is
+        unavailable, so an outage never locks users out.
+        """
+        user_key, team_key = self._keys(team_id, user_id)
+        now = time.monotonic()
+
+        retry_after = self._locally_blocked((user_key, team_key), now)
+        if retry_after is not None:
+            self._count('rejected_local')
+            return False, retry_after
+
+        try:
+            client = db.get_redis_client()
+            if client is None:
+                raise ConnectionError("Redis client is not initialized")
+            if self._script is None:
+                self._script = client.register_script(_TOKEN_BUCKET_SCRIPT)
+            result = self._script(keys=[user_key, team_key], args=self._args(), client=client)
+        except Exception as e:
+            logger.error(f"Rate limit check failed, allowing request: {str(e)}")
+            self._count('errors')
+            return True, 0.0
+        return self._record(result, user_key, team_key, now)
+
+    async def check_async(self, team_id, user_id):
+        """check() on the asyncio client, for asgi.py; same buckets and local cache."""
+        # Deferred so WSGI workers never import redis.asyncio
+        import database_async
+
+        user_key, team_key = self._keys(team_id, user_id)
+        now = time.monotonic()
+
+        retry_after = self._locally_blocked((user_key, team_key), now)
+        if retry_after is not None:
+            self._count('rejected_local')
+            return False, retry_after
+
+        try:
+            if self._async_script is None:
+                self._async_script = database_async.get_redis_client().register_script(_TOKEN_BUCKET_SCRIPT)
+            result = await self._async_script(keys=[user_key, team_key], args=self._args())
+        except Exception as e:
+            logger.error(f"Rate limit check failed, allowing request: {str(e)}")
+            self._count('errors')
+            return True, 0.0
+        return self._record(result, user_key, team_key, now)
+
+    def _record(self, result, user_key, team_key, now):
+        """Turn the script's reply into (allowed, retry_after_seconds)."""
+        allowed, retry_after_ms, team_exhausted = result
+        if allowed:
+            self._count('allowed')
+            return True, 0.0
+        retry_after = int(retry_after_ms) / 1000.0
+        self._block_locally(team_key if team_exhausted else user_key, now + retry_after)
+        self._count('rejected')
+        return False, retry_after
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, enabled=RATE_LIMIT_ENABLED, locally_blocked=len(self._blocked_until))
+
+
+limiter = RateLimiter()
+
+
+def check(team_id, user_id):
+    """Check the shared limiter; always allows when RATE_LIMIT_ENABLED is off."""
+    if not RATE_LIMIT_ENABLED:
+        return True, 0.0
+    return limiter.check(team_id, user_id)
+
+
+async def check_async(team_id, user_id):
+    """check() for the asyncio entry point."""
+    if not RATE_LIMIT_ENABLED:
+        return True, 0.0
+    return await limiter.check_async(team_id, user_id)
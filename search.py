@@ -0,0 +1,101 @@
+"""
+Tokenizing and BM25 ranking for full-text search over definitions, and
+the normalization behind alias lookups.
+
+The inverted index and alias index live in Redis (see database.py); this
+module only turns text into index terms and keys and scores postings.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+
+# BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+")
+# Endings that look plural but usually aren't (class, status, analysis)
+_NOT_PLURAL = ('ss', 'us', 'is')
+# Plurals formed with -es rather than -s
+_ES_PLURALS = ('sses', 'uses', 'xes', 'zes', 'ches', 'shes')
+# Shortest stem singularizing may leave; shorter words are kept whole
+_MIN_STEM = 3
+
+# Words too common to be worth a posting list
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the
+this to was were will with what which who used use uses using thing
+""".split())
+
+
+def tokenize(text):
+    """Split text into lowercase index terms, dropping stopwords and single letters."""
+    return [
+        token for token in _TOKEN_RE.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def _not_plural(word):
+    # Casefolded acronym plurals look like apis, kpis, uris; the -is words
+    # that aren't plurals (basis, thesis, analysis) are longer
+    if word.endswith('is'):
+        return len(word) > _MIN_STEM + 1
+    return word.endswith(_NOT_PLURAL)
+
+
+def _singular(word):
+    """Crudely singularize a casefolded word, never leaving a stem under _MIN_STEM letters."""
+    if len(word) <= _MIN_STEM or not word.endswith('s') or _not_plural(word):
+        return word
+    if word.endswith('ies') and len(word) - 3 >= _MIN_STEM - 1:
+        return word[:-3] + 'y'
+    if word.endswith(_ES_PLURALS) and len(word) - 2 >= _MIN_STEM:
+        return word[:-2]
+    return word[:-1]
+
+
+def normalize(text):
+    """
+    Reduce a term or alias to its alias-index key: casefolded, without
+    punctuation or whitespace, each word crudely singularized.
+
+    Casing is ignored, so a name, its lowercased form and any mix of the
+    two give the same key. Words of three letters or fewer are left alone,
+    which keeps acronyms like "AWS" or "GPS" from losing their S.
+    "TL;DR", "tl dr" and "TLDRs" all become "tldr"; "APIs" and "apis"
+    become "api"; "e.o.d." becomes "eod".
+    """
+    words = _PUNCTUATION_RE.sub('', text.casefold()).split()
+    return ''.join(_singular(word) for word in words)
+
+
+def document_payload(term, definition):
+    """Term frequencies and length of a glossary entry, as stored in the index."""
+    frequencies = Counter(tokenize(f"{term} {definition}"))
+    return {'tf': dict(frequencies), 'len': sum(frequencies.values())}
+
+
+def rank(postings, doc_count, total_length, limit=10):
+    """
+    Score documents with BM25.
+
+    `postings` maps each query token to {doc: (tf, doc_length)}. Returns up
+    to `limit` (doc, score) pairs, best first.
+    """
+    if not doc_count:
+        return []
+    avg_length = total_length / doc_count if total_length else 1.0
+    scores = {}
+    for docs in postings.values():
+        if not docs:
+            continue
+        df = len(docs)
+        idf = math.log((doc_count - df + 0.5) / (df + 0.5) + 1)
+        for doc, (tf, length) in docs.items():
+            norm = tf + K1 * (1 - B + B * length / avg_length)
+            scores[doc] = scores.get(doc, 0.0) + idf * tf * (K1 + 1) / norm
+    return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
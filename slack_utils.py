@@ -3,11 +3,61 @@ import json
 import hmac
 import hashlib
 import time
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
+import threading
+import logging
+from collections import OrderedDict
+import startup_profile
 
-# Initialize the Slack client with the bot token
-client = WebClient(token=os.environ.get("SLACK_BOT_TOKEN"))
+logger = logging.getLogger(__name__)
+
+# slack_sdk is slow to import, so the client is created on first use
+_client = None
+
+def get_slack_client():
+    """
+    Return the Slack Web API client, creating it on first use.
+    
+    Returns:
+        WebClient: A client authenticated with SLACK_BOT_TOKEN
+    """
+    global _client
+    if _client is None:
+        with startup_profile.phase('slack client'):
+            from slack_sdk import WebClient
+            _client = WebClient(token=os.environ.get("SLACK_BOT_TOKEN"))
+    return _client
+
+# Requests older than this are rejected before any hashing
+SLACK_MAX_REQUEST_AGE = 60 * 5  # seconds
+# Signatures seen within SLACK_MAX_REQUEST_AGE, to reject replayed requests
+REPLAY_CACHE_SIZE = 10000
+_replay_cache = OrderedDict()
+_replay_lock = threading.Lock()
+_signing_key = None
+
+def _get_signing_key():
+    """Read and encode SLACK_SIGNING_SECRET once."""
+    global _signing_key
+    if _signing_key is None:
+        secret = os.environ.get("SLACK_SIGNING_SECRET")
+        if not secret:
+            return None
+        _signing_key = secret.encode()
+    return _signing_key
+
+def _is_replay(signature, now):
+    """Remember a verified signature; True if it was already seen recently."""
+    with _replay_lock:
+        # Entries are inserted in time order, so expired ones are at the front
+        while _replay_cache:
+            oldest, seen_at = next(iter(_replay_cache.items()))
+            if now - seen_at <= SLACK_MAX_REQUEST_AGE and len(_replay_cache) < REPLAY_CACHE_SIZE:
+                break
+            _replay_cache.pop(oldest)
+        if signature in _replay_cache:
+            return True
+        _replay_cache[signature] = now
+        return False
 
 def verify_slack_request(request_data, timestamp, signature):
     """
@@ -21,28 +71,90 @@ def verify_slack_request(request_data, timestamp, signature):
     Returns:
         bool: True if the request is valid, False otherwise
     """
-    # Check if the timestamp is too old (more than 5 minutes)
-    if abs(time.time() - float(timestamp)) > 60 * 5:
+    if not timestamp or not signature:
         return False
     
-    # Get the signing secret from environment variables
-    slack_signing_secret = os.environ.get("SLACK_SIGNING_SECRET")
-    if not slack_signing_secret:
-        print("Warning: SLACK_SIGNING_SECRET not set")
+    # Check if the timestamp is too old (more than 5 minutes) before hashing anything
+    now = time.time()
+    try:
+        if abs(now - int(timestamp)) > SLACK_MAX_REQUEST_AGE:
+            return False
+    except ValueError:
         return False
     
-    # Create the signature base string
-    sig_basestring = f"v0:{timestamp}:{request_data.decode('utf-8')}"
+    signing_key = _get_signing_key()
+    if signing_key is None:
+        logger.warning("SLACK_SIGNING_SECRET is not set; rejecting Slack request")
+        return False
     
-    # Create the signature to compare with the one from Slack
+    # Sign the raw bytes: "v0:<timestamp>:<body>"
     my_signature = 'v0=' + hmac.new(
-        slack_signing_secret.encode(),
-        sig_basestring.encode(),
+        signing_key,
+        b'v0:' + timestamp.encode() + b':' + request_data,
         hashlib.sha256
     ).hexdigest()
     
     # Compare signatures using a constant-time comparison to prevent timing attacks
-    return hmac.compare_digest(my_signature, signature)
+    if not hmac.compare_digest(my_signature.encode(), signature.encode()):
+        return False
+    return not _is_replay(signature, now)
+
+# Pooled HTTP session for posting to response_url, created on first use
+SLACK_RESPONSE_TIMEOUT = float(os.environ.get("SLACK_RESPONSE_TIMEOUT", "5"))  # seconds
+SLACK_RESPONSE_RETRIES = int(os.environ.get("SLACK_RESPONSE_RETRIES", "3"))
+_session = None
+
+def get_http_session():
+    """
+    Return the shared requests session used to post to Slack.
+    
+    Returns:
+        requests.Session: A session with connection pooling and retries on
+        connection errors, 429 and 5xx responses
+    """
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        retry = Retry(
+            total=SLACK_RESPONSE_RETRIES,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["POST"]),
+            respect_retry_after_header=True
+        )
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=16))
+        _session = session
+    return _session
+
+def post_to_response_url(response_url, payload):
+    """
+    Post a full message payload to a slash command's response_url.
+    
+    Args:
+        response_url (str): The URL Slack sent with the command
+        payload (dict): The message, e.g. with "blocks" and "response_type"
+        
+    Returns:
+        bool: True if Slack accepted the message, False otherwise
+    """
+    try:
+        response = get_http_session().post(
+            response_url,
+            json=payload,
+            timeout=SLACK_RESPONSE_TIMEOUT
+        )
+    except Exception as e:
+        logger.error(f"Error sending Slack response: {type(e).__name__}: {str(e)}")
+        return False
+    
+    if response.status_code != 200:
+        logger.warning(f"Slack rejected a response: {response.status_code} {response.text}")
+        return False
+    return True
 
 def send_slack_response(response_url, message, response_type="ephemeral"):
     """
@@ -53,21 +165,10 @@ def send_slack_response(response_url, message, response_type="ephemeral"):
         message (str): The message to send
         response_type (str): "ephemeral" (only visible to the user) or "in_channel" (visible to everyone)
     """
-    import requests
-    
-    payload = {
+    return post_to_response_url(response_url, {
         "text": message,
         "response_type": response_type
-    }
-    
-    response = requests.post(
-        response_url,
-        json=payload,
-        headers={"Content-Type": "application/json"}
-    )
-    
-    if response.status_code != 200:
-        print(f"Error sending Slack response: {response.status_code} {response.text}")
+    })
 
 def format_term_response(term_data, similar_terms=None):
     """
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Cold-start profiling for the WSGI entry point.
+
+Startup phases (env load, Redis connect, init_db, Slack client) record
+their duration through `phase()`. Run this file to import wsgi.py in a
+fresh interpreter under `python -X importtime` and get a per-module import
+report plus per-phase timings:
+
+    python startup_profile.py --budget-ms 1500
+
+The exit status is 1 when the cold start exceeds the budget, so the
+command can run as a regression benchmark in CI.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+# With STARTUP_PROFILE=true, wsgi.py runs every lazy startup phase eagerly
+# and prints the phase report once the app is imported
+STARTUP_PROFILE = os.getenv('STARTUP_PROFILE', 'false').lower() == 'true'
+STARTUP_BUDGET_MS = float(os.getenv('STARTUP_BUDGET_MS', '1500'))
+REPORT_PREFIX = 'STARTUP_PROFILE '
+
+_phases = []
+
+
+@contextmanager
+def phase(name):
+    """Record how long the enclosed startup phase takes."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases.append((name, (time.perf_counter() - start) * 1000))
+
+
+def get_phases():
+    """Return the recorded phases as (name, milliseconds) pairs."""
+    return list(_phases)
+
+
+def run_eager_phases():
+    """Run the phases that are normally deferred to the first request."""
+    import database as db
+    import slack_utils
+
+    db.get_redis_client()
+    slack_utils.get_slack_client()
+    with phase('import rapidfuzz'):
+        import rapidfuzz.process  # noqa: F401
+
+
+def print_report():
+    """Print the phase timings as one JSON line for the harness to parse."""
+    print(REPORT_PREFIX + json.dumps([{'phase': name, 'ms': ms} for name, ms in _phases]))
+    sys.stdout.flush()
+
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` output into (module, self_us, cumulative_us, depth) tuples."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        # Nested imports are indented by two spaces per level after one separator space
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(self_us.strip()), int(cumulative_us.strip()), depth))
+    return modules
+
+
+def profile_cold_start():
+    """Import wsgi.py in a fresh interpreter and return (wall_ms, modules, phases)."""
+    env = dict(os.environ, STARTUP_PROFILE='true')
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import wsgi'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing wsgi failed:\n{result.stderr[-2000:]}")
+
+    phases = []
+    for line in result.stdout.splitlines():
+        if line.startswith(REPORT_PREFIX):
+            phases = json.loads(line[len(REPORT_PREFIX):])
+    return wall_ms, parse_importtime(result.stderr), phases
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile the cold start of wsgi.py.')
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS,
+                        help='fail when the cold start takes longer than this')
+    parser.add_argument('--top', type=int, default=15, help='number of modules to list')
+    args = parser.parse_args()
+
+    wall_ms, modules, phases = profile_cold_start()
+
+    # wsgi -> app -> flask/redis/... : the first few levels show which of our
+    # own imports pull in the heavy packages
+    print("Slowest imports (cumulative, first three levels):")
+    top_level = sorted((m for m in modules if m[3] <= 2), key=lambda m: m[2], reverse=True)
+    for name, _, cumulative_us, _ in top_level[:args.top]:
+        print(f"  {cumulative_us / 1000:>9.1f} ms  {name}")
+
+    print("Slowest modules (self):")
+    for name, self_us, _, _ in sorted(modules, key=lambda m: m[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:>9.1f} ms  {name}")
+
+    print("Startup phases:")
+    for item in phases:
+        print(f"  {item['ms']:>9.1f} ms  {item['phase']}")
+
+    print(f"Cold start: {wall_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if wall_ms > args.budget_ms:
+        print("Cold start is over budget")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
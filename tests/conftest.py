@@ -0,0 +1,20 @@
+import fakeredis
+import pytest
+
+import database as db
+
+
+@pytest.fixture
+def redis_db(monkeypatch):
+    """An initialized default namespace on a fresh in-memory Redis (Lua via lupa)."""
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(db, 'redis_client', client)
+    # Read terms:version on every lookup, and leave snapshots off
+    monkeypatch.setattr(db, 'TERM_CACHE_VERSION_INTERVAL', 0)
+    monkeypatch.setattr(db, 'SNAPSHOT_DIR', '')
+    db._namespaces.clear()
+    db._registered_scripts.clear()
+    db.init_db()
+    yield client
+    db._namespaces.clear()
+    db._registered_scripts.clear()
@@ -0,0 +1,46 @@
+import pytest
+
+import database as db
+import search
+
+
+@pytest.mark.parametrize('text, key', [
+    ('APIs', 'api'),
+    ('apis', 'api'),
+    ('KPIs', 'kpi'),
+    ('AWS', 'aws'),
+    ('aws', 'aws'),
+    ('TL;DR', 'tldr'),
+    ('TLDRs', 'tldr'),
+    ('e.o.d.', 'eod'),
+    ('analysis', 'analysis'),
+    ('policies', 'policy'),
+])
+def test_normalize(text, key):
+    assert search.normalize(text) == key
+
+
+def test_normalize_ignores_case():
+    for text in ('APIs', 'KPIs', 'AWS', 'Merge Requests', 'TL;DRs'):
+        assert search.normalize(text) == search.normalize(text.lower())
+
+
+def test_plural_acronyms_resolve(redis_db):
+    assert db.add_term('API', 'Application Programming Interface', aliases=['APIs', 'KPIs']) is True
+    for text in ('API', 'APIs', 'apis', 'KPIs', 'kpis'):
+        assert db.get_term(text)['term'] == 'API'
+
+
+def test_short_acronyms_keep_their_s(redis_db):
+    db.add_term('AWS', 'Amazon Web Services')
+    assert db.get_term('aws')['term'] == 'AWS'
+    assert db.get_term('aw') is None
+    db.add_term('AW', 'Acronym without an S')
+    assert db.get_term('AW')['term'] == 'AW'
+    assert db.get_term('AWS')['term'] == 'AWS'
+
+
+def test_variants_resolve(redis_db):
+    db.add_term('TL;DR', 'Too long; did not read')
+    assert db.get_term('tl dr')['term'] == 'TL;DR'
+    assert db.get_term('TLDRs')['term'] == 'TL;DR'
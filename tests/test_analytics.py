@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import app as flask_app
+import database as db
+import log_archive
+import log_writer
+
+
+def test_refresh_releases_only_its_own_lock(redis_db, monkeypatch):
+    lock_key = db.ANALYTICS_SNAPSHOT_LOCK_KEY
+    original = db.get_analytics
+
+    def slow_refresh(*args, **kwargs):
+        # Our lock expired mid-refresh and another process took it
+        redis_db.set(lock_key, 'other-process')
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(db, 'get_analytics', slow_refresh)
+    db.log_query('U1', 'eod', True)
+    assert db.get_analytics_snapshot()['version'] == 1
+    assert redis_db.get(lock_key) == 'other-process'
+
+
+def test_refresh_releases_its_lock(redis_db):
+    db.log_query('U1', 'eod', True)
+    assert db.get_analytics_snapshot()['analytics']['total_queries'] == 1
+    assert not redis_db.exists(db.ANALYTICS_SNAPSHOT_LOCK_KEY)
+
+
+def test_searches_are_counted_apart_from_term_lookups(redis_db, monkeypatch, tmp_path):
+    monkeypatch.setattr(log_writer, 'ASYNC_QUERY_LOG', False)
+    db.log_query('U1', 'eod', True)
+    flask_app.search_response('U2', 'end of day')
+    flask_app.search_response('U2', 'nothing matches this')
+
+    analytics = db.get_analytics()
+    assert analytics['top_terms'] == [{'term': 'eod', 'count': 1}]
+    assert (analytics['total_queries'], analytics['success_rate'], analytics['search_queries']) == (1, 100, 2)
+    assert analytics['unique_users'] == 1
+
+    today = datetime.utcnow().date()
+    ranged = log_archive.get_range_analytics(today, today, archive_dir=str(tmp_path))
+    assert (ranged['top_terms'], ranged['search_queries']) == (analytics['top_terms'], 2)
+
+    assert db.backfill_analytics() == 3
+    assert db.get_analytics() == analytics
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+
+import pytest
+
+import app as flask_app
+import bulk_io
+import database as db
+
+
+@pytest.fixture
+def client(redis_db):
+    return flask_app.app.test_client()
+
+
+def test_parse_ndjson_rows_and_errors():
+    stream = io.StringIO(
+        '{"term": " EOD ", "definition": "End of day"}\n'
+        '\n'
+        'not json\n'
+        '["EOD"]\n'
+        '{"term": "COB"}\n'
+    )
+    rows = list(bulk_io.parse(stream, 'ndjson'))
+
+    assert rows[0] == {'line': 1, 'term': 'EOD', 'definition': 'End of day'}
+    assert rows[1]['line'] == 3 and rows[1]['error'].startswith('Invalid JSON')
+    assert rows[2:] == [
+        {'line': 4, 'error': 'Expected a JSON object'},
+        {'line': 5, 'error': 'Both term and definition are required'},
+    ]
+
+
+def test_parse_csv_rows_and_errors():
+    stream = io.StringIO('term, definition\nEOD,End of day\n"COB","Close of, business"\nWIP,\n')
+    assert list(bulk_io.parse(stream, 'csv')) == [
+        {'line': 2, 'term': 'EOD', 'definition': 'End of day'},
+        {'line': 3, 'term': 'COB', 'definition': 'Close of, business'},
+        {'line': 4, 'error': 'Both term and definition are required'},
+    ]
+    assert list(bulk_io.parse(io.StringIO('name,meaning\nEOD,End of day\n'), 'csv')) == [
+        {'line': 1, 'error': 'Missing columns: definition, term'},
+    ]
+    assert list(bulk_io.parse(io.StringIO(''), 'csv')) == []
+
+
+def test_export_round_trips_through_parse():
+    terms = [{'term': 'COB', 'definition': 'Close of, business', 'created_at': 'x', 'updated_at': 'y'}]
+    for fmt in bulk_io.FORMATS:
+        text = ''.join(bulk_io.export(terms, fmt))
+        assert list(bulk_io.parse(io.StringIO(text), fmt))[0]['definition'] == 'Close of, business'
+
+
+def test_import_endpoint_reports_counts_and_errors(client):
+    body = '\n'.join([
+        json.dumps({'term': 'EOD', 'definition': 'End of day'}),
+        json.dumps({'term': 'test', 'definition': 'Replaced'}),
+        'oops',
+    ])
+    response = client.post('/admin/import?format=ndjson&mode=skip&batch_size=1', data=body)
+    assert response.status_code == 200
+    report = response.get_json()
+    assert (report['added'], report['updated'], report['skipped'], report['error_count']) == (1, 0, 1, 1)
+    assert report['errors'][0]['line'] == 3
+
+    response = client.post('/admin/import?format=csv&mode=upsert', data='term,definition\ntest,Replaced\n')
+    assert response.get_json()['updated'] == 1
+    assert db.get_term('test')['definition'] == 'Replaced'
+    assert db.get_term('eod')['definition'] == 'End of day'
+
+
+def test_import_endpoint_rejects_bad_parameters(client):
+    for query in ('format=xml', 'mode=replace', 'batch_size=abc', 'batch_size=0'):
+        assert client.post(f'/admin/import?{query}', data='').status_code == 400
+
+
+def test_export_endpoint_streams_every_term(client):
+    db.import_terms([{'line': 1, 'term': 'EOD', 'definition': 'End of day'}])
+
+    response = client.get('/admin/export?format=ndjson')
+    assert response.mimetype == 'application/x-ndjson'
+    assert [json.loads(line)['term'] for line in response.get_data(as_text=True).splitlines()] == ['EOD', 'test']
+
+    response = client.get('/admin/export?format=csv')
+    assert response.headers['Content-Disposition'] == 'attachment; filename=glossary.csv'
+    assert [row['term'] for row in csv.DictReader(io.StringIO(response.get_data(as_text=True)))] == ['EOD', 'test']
+
+    assert client.get('/admin/export?format=xml').status_code == 400
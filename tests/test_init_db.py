@@ -0,0 +1,33 @@
+import database as db
+
+
+def test_missing_name_index_is_left_to_the_operator(redis_db):
+    db.add_term('EOD', 'End of day')
+    redis_db.delete(db.TERMS_INDEX_KEY)
+    db._namespaces.clear()
+
+    assert db.init_db() is True
+    assert not redis_db.exists(db.TERMS_INDEX_KEY)
+    # Exact lookups don't need the index, and bulk reads fall back to SCAN
+    assert db.get_term('EOD')['term'] == 'EOD'
+    assert [term['term'] for term in db.get_all_terms()] == ['EOD', 'test']
+    assert [term['term'] for term in db.find_similar_terms('eodd')] == ['EOD']
+    assert db.autocomplete('eo') == []
+
+    assert db.rebuild_term_index() == 2
+    assert db.autocomplete('eo') == ['EOD']
+
+
+def test_missing_search_and_alias_indexes_are_left_to_the_operator(redis_db):
+    db.add_term('TL;DR', 'Too long; did not read')
+    redis_db.delete(db.SEARCH_STATS_KEY, db.ALIASES_KEY)
+    db._namespaces.clear()
+
+    assert db.init_db() is True
+    assert not redis_db.exists(db.SEARCH_STATS_KEY)
+    assert db.get_term('tl dr') is None
+
+    db.rebuild_search_index()
+    db.rebuild_alias_index()
+    assert db.get_term('tl dr')['term'] == 'TL;DR'
+    assert [term['term'] for term in db.search_terms('long')] == ['TL;DR']
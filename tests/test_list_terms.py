@@ -0,0 +1,24 @@
+import database as db
+
+
+def test_substring_search_stops_after_max_scans_and_returns_cursor(redis_db, monkeypatch):
+    monkeypatch.setattr(db, 'LIST_TERMS_MAX_SCANS', 1)
+    db.import_terms([{'term': f'T{i:03}', 'definition': 'filler'} for i in range(300)])
+    db.add_term('Needle', 'The one match')
+
+    terms, cursor = db.list_terms(limit=10, query='needl', match='substring')
+    pages = 1
+    while cursor is not None:
+        more, cursor = db.list_terms(cursor=cursor, limit=10, query='needl', match='substring')
+        terms += more
+        pages += 1
+
+    assert [term['term'] for term in terms] == ['Needle']
+    # count=100 per ZSCAN over 302 members: the search takes several short pages
+    assert pages > 1
+
+
+def test_substring_search_with_no_hits_ends_with_null_cursor(redis_db):
+    db.add_term('EOD', 'End of day')
+
+    assert db.list_terms(limit=10, query='zzz', match='substring') == ([], None)
@@ -0,0 +1,62 @@
+import time
+
+import fakeredis
+
+import rate_limit
+
+
+def test_burst_is_allowed_then_the_next_call_is_rejected(redis_db):
+    limiter = rate_limit.RateLimiter(user_per_minute=60, user_burst=3)
+
+    assert [limiter.check('T1', 'U1')[0] for _ in range(3)] == [True, True, True]
+    allowed, retry_after = limiter.check('T1', 'U1')
+    assert not allowed
+    assert 0 < retry_after <= 1
+    # Another user in the workspace has their own bucket
+    assert limiter.check('T1', 'U2') == (True, 0.0)
+
+
+def test_rejected_user_is_refused_locally_until_retry_time(redis_db):
+    limiter = rate_limit.RateLimiter(user_per_minute=60, user_burst=1)
+    limiter.check('T1', 'U1')
+    limiter.check('T1', 'U1')
+
+    assert not limiter.check('T1', 'U1')[0]
+    assert limiter.stats['rejected'] == 1
+    assert limiter.stats['rejected_local'] == 1
+
+
+def test_bucket_refills(redis_db):
+    # 20 tokens a second, so a token is back after 50ms
+    limiter = rate_limit.RateLimiter(user_per_minute=1200, user_burst=2)
+    assert limiter.check('T1', 'U1')[0]
+    assert limiter.check('T1', 'U1')[0]
+    allowed, retry_after = limiter.check('T1', 'U1')
+    assert not allowed
+
+    time.sleep(retry_after + 0.02)
+    assert limiter.check('T1', 'U1') == (True, 0.0)
+
+
+def test_workspace_bucket_limits_all_its_users(redis_db):
+    limiter = rate_limit.RateLimiter(team_per_minute=60, team_burst=2)
+
+    assert limiter.check('T1', 'U1')[0]
+    assert limiter.check('T1', 'U2')[0]
+    assert not limiter.check('T1', 'U3')[0]
+    # The workspace is blocked locally, so its other users are refused too
+    assert not limiter.check('T1', 'U4')[0]
+    assert limiter.check('T2', 'U1')[0]
+
+
+def test_disabled_or_unreachable_redis_allows(redis_db, monkeypatch):
+    monkeypatch.setattr(rate_limit, 'RATE_LIMIT_ENABLED', False)
+    monkeypatch.setattr(rate_limit, 'limiter', rate_limit.RateLimiter(user_per_minute=60, user_burst=0))
+    assert rate_limit.check('T1', 'U1') == (True, 0.0)
+
+    server = fakeredis.FakeServer()
+    server.connected = False
+    monkeypatch.setattr(rate_limit.db, 'redis_client', fakeredis.FakeRedis(server=server))
+    limiter = rate_limit.RateLimiter(user_per_minute=60, user_burst=0)
+    assert limiter.check('T1', 'U1') == (True, 0.0)
+    assert limiter.stats['errors'] == 1
@@ -0,0 +1,36 @@
+import pytest
+
+import app as flask_app
+import database as db
+import deferred
+import log_writer
+
+
+@pytest.fixture
+def client(redis_db, monkeypatch):
+    monkeypatch.setattr(flask_app, 'SLACK_VERIFY_REQUESTS', False)
+    monkeypatch.setattr(deferred, 'DEFERRED_RESPONSES', False)
+    monkeypatch.setattr(log_writer, 'ASYNC_QUERY_LOG', False)
+    return flask_app.app.test_client()
+
+
+def lookup(client, text):
+    response = client.post('/slack/command', data={'text': text, 'user_id': 'U1'})
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+
+def test_only_misses_are_cached_until_the_glossary_changes(client):
+    db.add_term('EOD', 'End of day')
+    cache = db.get_namespace().response_cache
+
+    assert 'End of day' in lookup(client, 'eod')
+    assert cache.stats()['size'] == 0
+
+    first = lookup(client, 'eodd')
+    assert 'EOD' in first
+    assert lookup(client, 'eodd') == first
+    assert cache.stats()['hits'] == 1
+
+    db.add_term('EODD', 'End of day, doubled')
+    assert 'End of day, doubled' in lookup(client, 'eodd')
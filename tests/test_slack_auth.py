@@ -0,0 +1,75 @@
+import hashlib
+import hmac
+import time
+from urllib.parse import urlencode
+
+import pytest
+
+import app as flask_app
+import deferred
+import log_writer
+import slack_utils
+
+SECRET = 'test-signing-secret'
+
+
+@pytest.fixture(autouse=True)
+def signing_secret(monkeypatch):
+    monkeypatch.setenv('SLACK_SIGNING_SECRET', SECRET)
+    monkeypatch.setattr(slack_utils, '_signing_key', None)
+    monkeypatch.setattr(slack_utils, '_replay_cache', type(slack_utils._replay_cache)())
+
+
+def sign(body, timestamp, secret=SECRET):
+    digest = hmac.new(secret.encode(), f'v0:{timestamp}:'.encode() + body, hashlib.sha256).hexdigest()
+    return f'v0={digest}'
+
+
+def test_valid_signature_is_accepted():
+    body, timestamp = b'text=eod&user_id=U1', str(int(time.time()))
+    assert slack_utils.verify_slack_request(body, timestamp, sign(body, timestamp))
+
+
+def test_bad_signature_is_rejected():
+    body, timestamp = b'text=eod&user_id=U1', str(int(time.time()))
+    assert not slack_utils.verify_slack_request(body, timestamp, sign(body, timestamp, secret='wrong'))
+    assert not slack_utils.verify_slack_request(b'text=cob&user_id=U1', timestamp, sign(body, timestamp))
+    assert not slack_utils.verify_slack_request(body, timestamp, '')
+
+
+def test_stale_timestamp_is_rejected():
+    body = b'text=eod&user_id=U1'
+    for timestamp in (str(int(time.time()) - slack_utils.SLACK_MAX_REQUEST_AGE - 10), 'not-a-number'):
+        assert not slack_utils.verify_slack_request(body, timestamp, sign(body, timestamp))
+
+
+def test_replayed_request_is_rejected():
+    body, timestamp = b'text=eod&user_id=U1', str(int(time.time()))
+    signature = sign(body, timestamp)
+    assert slack_utils.verify_slack_request(body, timestamp, signature)
+    assert not slack_utils.verify_slack_request(body, timestamp, signature)
+
+
+def test_missing_secret_rejects_everything(monkeypatch):
+    monkeypatch.delenv('SLACK_SIGNING_SECRET')
+    body, timestamp = b'text=eod&user_id=U1', str(int(time.time()))
+    assert not slack_utils.verify_slack_request(body, timestamp, sign(body, timestamp))
+
+
+def test_slack_routes_require_a_signature(redis_db, monkeypatch):
+    monkeypatch.setattr(flask_app, 'SLACK_VERIFY_REQUESTS', True)
+    monkeypatch.setattr(deferred, 'DEFERRED_RESPONSES', False)
+    monkeypatch.setattr(log_writer, 'ASYNC_QUERY_LOG', False)
+    client = flask_app.app.test_client()
+    body = urlencode({'text': 'test', 'user_id': 'U1'}).encode()
+    timestamp = str(int(time.time()))
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'X-Slack-Request-Timestamp': timestamp}
+
+    response = client.post('/slack/command', data=body, headers=dict(headers, **{'X-Slack-Signature': 'v0=bad'}))
+    assert response.status_code == 401
+
+    response = client.post('/slack/command', data=body, headers=dict(headers, **{'X-Slack-Signature': sign(body, timestamp)}))
+    assert response.status_code == 200
+    # The same signed request sent again is a replay
+    response = client.post('/slack/command', data=body, headers=dict(headers, **{'X-Slack-Signature': sign(body, timestamp)}))
+    assert response.status_code == 401
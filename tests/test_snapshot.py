@@ -0,0 +1,33 @@
+import database as db
+
+
+def test_reads_fall_back_to_the_snapshot_when_redis_is_unreachable(redis_db, monkeypatch, tmp_path):
+    monkeypatch.setattr(db, 'SNAPSHOT_DIR', str(tmp_path))
+    db.add_term('EOD', 'End of day', aliases=['end-of-day'])
+    store = db.refresh_snapshot()
+    assert store.version == redis_db.get(db.TERMS_VERSION_KEY)
+    assert store.get_term('eod')['definition'] == 'End of day'
+
+    monkeypatch.setattr(db, 'redis_client', None)
+    monkeypatch.setitem(db._connect_state, 'next_attempt_at', float('inf'))
+    ns = db.get_namespace()
+    ns.term_cache.clear()
+    ns.suggestion_index = (db._UNSET, (), ())
+
+    assert db.get_term('end of day')['term'] == 'EOD'
+    assert db.get_term('nope') is None
+    assert [term['term'] for term in db.find_similar_terms('eodd', limit=1)] == ['EOD']
+    assert [term['term'] for term in db.get_all_terms()] == ['EOD', 'test']
+
+
+def test_snapshot_holds_terms_missing_from_the_name_index(redis_db, monkeypatch, tmp_path):
+    monkeypatch.setattr(db, 'SNAPSHOT_DIR', str(tmp_path))
+    db.add_term('EOD', 'End of day')
+    db.add_term('COB', 'Close of business')
+    # e.g. written while rebuild_term_index ran, or a glossary that predates the index
+    redis_db.zrem(db.TERMS_INDEX_KEY, 'eod\0EOD')
+
+    store = db.refresh_snapshot()
+    assert store.terms_count == 3
+    assert db.get_term('eod')['term'] == 'EOD'
+    assert [term['term'] for term in store.terms()] == ['COB', 'EOD', 'test']
@@ -0,0 +1,142 @@
+import threading
+
+import pytest
+
+import database as db
+
+
+def run_threads(target, count=8):
+    """Start `count` threads on target(i) at once and wait for them."""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(i):
+        barrier.wait()
+        results[i] = target(i)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def version(client):
+    return int(client.get(db.TERMS_VERSION_KEY))
+
+
+def test_write_scripts_keep_indexes_and_version_in_step(redis_db):
+    start = version(redis_db)
+    assert db.add_term('EOD', 'End of day', aliases=['end-of-day']) is True
+    assert db.add_term('eod', 'Duplicate') is False
+    assert redis_db.get('terms:count') == '2'
+    assert db.autocomplete('eo') == ['EOD']
+    assert [term['term'] for term in db.search_terms('day')] == ['EOD']
+    assert db.get_term('end of day')['term'] == 'EOD'
+
+    assert db.update_term('EOD', 'Close of business') is True
+    assert [term['term'] for term in db.search_terms('business')] == ['EOD']
+    assert db.search_terms('day') == []
+
+    assert db.delete_term('EOD') is True
+    assert redis_db.get('terms:count') == '1'
+    assert db.autocomplete('eo') == []
+    assert db.search_terms('business') == []
+    assert not redis_db.hexists(db.ALIASES_KEY, 'endofday')
+    # One bump per successful write, none for the rejected duplicate
+    assert version(redis_db) == start + 3
+
+
+def test_alias_conflicts_write_nothing(redis_db):
+    db.add_term('PR', 'Pull request', aliases=['pull-request'])
+    before = version(redis_db)
+    with pytest.raises(db.AliasConflictError) as excinfo:
+        db.add_term('Pull', 'Something else', aliases=['pull request'])
+    assert excinfo.value.aliases == ['pull request']
+    assert db.get_term('pull') is None
+    assert version(redis_db) == before
+
+
+def test_another_workers_write_invalidates_the_term_cache(redis_db):
+    db.add_term('EOD', 'End of day')
+    assert db.get_term('EOD')['definition'] == 'End of day'
+    # Written by another process: this worker's caches only learn of it
+    # through terms:version
+    redis_db.hset('term:eod', 'definition', 'Close of business')
+    assert db.get_term('EOD')['definition'] == 'End of day'
+    redis_db.incr(db.TERMS_VERSION_KEY)
+    assert db.get_term('EOD')['definition'] == 'Close of business'
+
+
+def test_cached_misses_are_invalidated_by_a_write(redis_db):
+    assert db.get_term('EOD') is None
+    db.add_term('EOD', 'End of day')
+    assert db.get_term('EOD')['term'] == 'EOD'
+
+
+def test_concurrent_adds_of_one_term_create_it_once(redis_db):
+    results = run_threads(lambda i: db.add_term('EOD', f'Definition {i}'))
+    assert results.count(True) == 1
+    assert redis_db.get('terms:count') == '2'
+    assert db.autocomplete('eod') == ['EOD']
+
+
+def test_concurrent_adds_keep_the_count_exact(redis_db):
+    results = run_threads(lambda i: db.add_term(f'TERM{i}', f'Definition {i}'), count=16)
+    assert all(results)
+    assert redis_db.get('terms:count') == '17'
+    assert len(db.get_all_terms()) == 17
+
+
+def test_analytics_refresh_is_single_flight(redis_db, monkeypatch):
+    db.log_query('U1', 'eod', True)
+    calls = []
+    original = db.get_analytics
+
+    def counting_get_analytics(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(db, 'get_analytics', counting_get_analytics)
+    results = run_threads(lambda i: db.get_analytics_snapshot())
+    assert len(calls) == 1
+    assert {result['version'] for result in results} == {1}
+
+
+@pytest.mark.parametrize('batch_size', [1, 3, 500])
+def test_import_batches(redis_db, batch_size):
+    db.add_term('EOD', 'End of day')
+    start = version(redis_db)
+    rows = [{'line': i, 'term': f'TERM{i}', 'definition': f'Definition {i}'} for i in range(1, 8)]
+    rows.append({'line': 8, 'term': 'eod', 'definition': 'Overwritten?'})
+    rows.append({'line': 9, 'error': 'missing definition'})
+
+    report = db.import_terms(rows, batch_size=batch_size)
+    assert (report['added'], report['skipped'], report['error_count']) == (7, 1, 1)
+    assert db.get_term('EOD')['definition'] == 'End of day'
+
+    report = db.import_terms(rows[-2:-1], mode='upsert', batch_size=batch_size)
+    assert report['updated'] == 1
+    assert db.get_term('EOD')['definition'] == 'Overwritten?'
+    assert redis_db.get('terms:count') == '9'
+    assert len(db.autocomplete('term', limit=20)) == 7
+    assert version(redis_db) == start + 8
+
+
+def test_a_read_that_finishes_after_a_write_is_not_cached(redis_db, monkeypatch):
+    db.add_term('EOD', 'End of day')
+    resolve_term = db._resolve_term
+
+    def slow_resolve(term, ns):
+        term_data = resolve_term(term, ns)
+        # While this read is in flight the term is updated and another
+        # thread caches the new definition at the new version
+        monkeypatch.setattr(db, '_resolve_term', resolve_term)
+        db.update_term('EOD', 'Close of business')
+        assert db.get_term('EOD')['definition'] == 'Close of business'
+        return term_data
+
+    monkeypatch.setattr(db, '_resolve_term', slow_resolve)
+    assert db.get_term('EOD')['definition'] == 'End of day'
+    assert db.get_term('EOD')['definition'] == 'Close of business'
@@ -0,0 +1,34 @@
+import pytest
+
+import app as flask_app
+import database as db
+import deferred
+import log_writer
+
+
+@pytest.fixture
+def client(redis_db, monkeypatch):
+    monkeypatch.setattr(flask_app, 'SLACK_VERIFY_REQUESTS', False)
+    monkeypatch.setattr(deferred, 'DEFERRED_RESPONSES', False)
+    monkeypatch.setattr(log_writer, 'ASYNC_QUERY_LOG', False)
+    monkeypatch.setattr(db, 'MULTI_TENANT', True)
+    return flask_app.app.test_client()
+
+
+def test_admin_form_team_id_is_validated(client):
+    response = client.post('/admin/add', data={'term': 'EOD', 'definition': 'End of day', 'team_id': 'bad id!'})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid team_id'}
+
+
+def test_slash_command_team_id_is_validated(client):
+    response = client.post('/slack/command', data={'text': 'eod', 'user_id': 'U1', 'team_id': '../T1'})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid team_id'}
+
+
+def test_slash_command_uses_the_workspace_glossary(client):
+    db.add_term('EOD', 'End of day', tenant='T1')
+    response = client.post('/slack/command', data={'text': 'eod', 'user_id': 'U1', 'team_id': 'T1'})
+    assert response.status_code == 200
+    assert 'End of day' in response.get_data(as_text=True)
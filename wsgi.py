@@ -1,17 +1,24 @@
+import os
 import sys
 import logging
-from app import app
+import startup_profile
+
+with startup_profile.phase('import app'):
+    from app import app
 
 # Configure logging
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
 # Log startup information
-logger.info(f"Starting application with Python version: {sys.version}")
-logger.info(f"sys.path: {sys.path}")
+logger.info("Starting application with Python version: %s", sys.version)
+
+if startup_profile.STARTUP_PROFILE:
+    startup_profile.run_eager_phases()
+    startup_profile.print_report()
 
 # This is the entry point for Vercel
 application = app